@@ -0,0 +1,405 @@
+"""Offline benchmark of the Peloton update path.
+
+Replays the recorded API responses in fixtures/ from a local server and runs
+them through the coordinator's update method, compile_quant_data and the
+sensor and binary sensor update handlers. For each scenario it reports
+throughput, garbage collector activity, peak traced memory and the p99
+event loop lag, so regressions show up without network access.
+
+Needs Home Assistant installed (e.g. in the devcontainer). Run from the
+repository root:
+
+    python -m benchmarks.bench_update --iterations 200 --duration 90
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+import copy
+import gc
+import hashlib
+import inspect
+import json
+from pathlib import Path
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+from aiohttp import web
+from aiohttp.test_utils import unused_port
+from homeassistant import config_entries
+from homeassistant.config_entries import ConfigEntries, ConfigEntry, ConfigEntryState
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+
+from custom_components.peloton import async_setup_entry, compile_quant_data
+from custom_components.peloton.binary_sensor import PelotonLastWorkout
+from custom_components.peloton.const import CONF_USER_ID, DOMAIN
+from custom_components.peloton.sensor import PelotonStat, PelotonStatSensor
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+# The event loop lag monitor wakes up this often, in seconds.
+LAG_SAMPLE_INTERVAL = 0.001
+
+
+def load_fixtures(duration: int) -> dict[str, Any]:
+    """Load the recorded responses, stretching the ride to duration minutes.
+
+    The recorded performance graph holds one minute of 1 Hz samples, which
+    is tiled to the full ride so long rides can be benchmarked without
+    shipping megabytes of fixtures. The ride is moved to end an hour ago so
+    it always falls within the rolling windows.
+    """
+
+    fixtures = {
+        path.stem: json.loads(path.read_text()) for path in FIXTURES.glob("*.json")
+    }
+    seconds = duration * 60
+    created_at = int(time.time()) - 3600 - seconds
+    for workout in (fixtures["workout"], *fixtures["workouts"]["data"]):
+        workout["created_at"] = created_at
+        workout["start_time"] = created_at + 30
+        workout["end_time"] = created_at + 30 + seconds
+    fixtures["workout"]["ride"]["duration"] = seconds
+    fixtures["performance_graph"]["duration"] = seconds
+    for metric in fixtures["performance_graph"]["metrics"]:
+        values = metric["values"]
+        metric["values"] = (values * (seconds // len(values) + 1))[:seconds]
+    return fixtures
+
+
+class ReplayServer:
+    """Serve the recorded responses in place of api.onepeloton.com.
+
+    Like the real API, the profile, settings and workout list carry an ETag
+    and answer a matching If-None-Match with 304.
+    """
+
+    def __init__(self, fixtures: dict[str, Any]) -> None:
+        """Initialize the server."""
+        self.fixtures = fixtures
+        self.status = "COMPLETE"
+        self.requests = 0
+        self.not_modified = 0
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+
+    async def async_start(self) -> None:
+        """Start listening on a free local port."""
+
+        app = web.Application()
+        app.add_routes(
+            [
+                web.post("/oauth/token", self._token),
+                web.get("/api/me", self._fixture("me")),
+                web.get("/api/user/{user_id}/settings", self._fixture("settings")),
+                web.get("/api/user/{user_id}/workouts", self._workouts),
+                web.get("/api/workout/{workout_id}", self._workout),
+                web.get(
+                    "/api/workout/{workout_id}/performance_graph",
+                    self._performance_graph,
+                ),
+                web.get("/api/instructor/{instructor_id}", self._fixture("instructor")),
+            ]
+        )
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        port = unused_port()
+        await web.TCPSite(self._runner, "127.0.0.1", port).start()
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def async_stop(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def _fixture(
+        self, name: str
+    ) -> Callable[[web.Request], Awaitable[web.Response]]:
+        """Return a handler serving a fixture as it was recorded."""
+
+        body = json.dumps(self.fixtures[name]).encode()
+
+        async def handler(request: web.Request) -> web.Response:
+            self.requests += 1
+            return self._etagged(request, body)
+
+        return handler
+
+    def _etagged(self, request: web.Request, body: bytes) -> web.Response:
+        """Return body with an ETag, or 304 if the client already has it."""
+
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(
+            body=body, content_type="application/json", headers={"ETag": etag}
+        )
+
+    async def _token(self, request: web.Request) -> web.Response:
+        """Hand out a token for any login or refresh."""
+        return web.json_response({"access_token": "bench", "refresh_token": "bench"})
+
+    async def _workouts(self, request: web.Request) -> web.Response:
+        """Serve the workout list with the current status."""
+        self.requests += 1
+        workouts = copy.deepcopy(self.fixtures["workouts"])
+        for workout in workouts["data"]:
+            workout["status"] = self.status
+        return self._etagged(request, json.dumps(workouts).encode())
+
+    async def _workout(self, request: web.Request) -> web.Response:
+        """Serve the latest workout with the current status."""
+        self.requests += 1
+        return web.json_response({**self.fixtures["workout"], "status": self.status})
+
+    async def _performance_graph(self, request: web.Request) -> web.Response:
+        """Serve the performance graph downsampled to every_n."""
+
+        self.requests += 1
+        every_n = int(request.query.get("every_n", 1))
+        performance_graph = {
+            **self.fixtures["performance_graph"],
+            "metrics": [
+                {**metric, "values": metric["values"][::every_n]}
+                for metric in self.fixtures["performance_graph"]["metrics"]
+            ],
+        }
+        return web.json_response(performance_graph)
+
+
+class LoopLagMonitor:
+    """Sample how late the event loop wakes a sleeping task."""
+
+    def __init__(self) -> None:
+        """Initialize the monitor."""
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start sampling."""
+        self.samples = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> float:
+        """Stop sampling and return the p99 lag in milliseconds."""
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if len(self.samples) < 2:
+            return max(self.samples, default=0.0) * 1000
+        return statistics.quantiles(self.samples, n=100)[98] * 1000
+
+    async def _run(self) -> None:
+        """Record the lag of each wake-up."""
+        while True:
+            expected = time.perf_counter() + LAG_SAMPLE_INTERVAL
+            await asyncio.sleep(LAG_SAMPLE_INTERVAL)
+            self.samples.append(max(0.0, time.perf_counter() - expected))
+
+
+async def async_measure(
+    name: str, iterations: int, run: Callable[[], Awaitable[Any]]
+) -> dict[str, Any]:
+    """Run a scenario twice: once timed, once under tracemalloc."""
+
+    await run()  # Warm up caches and connections.
+
+    monitor = LoopLagMonitor()
+    gc.collect()
+    collections_before = [stats["collections"] for stats in gc.get_stats()]
+    monitor.start()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await run()
+    elapsed = time.perf_counter() - started
+    p99_lag = await monitor.stop()
+    collections = [
+        stats["collections"] - before
+        for stats, before in zip(gc.get_stats(), collections_before)
+    ]
+
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    for _ in range(iterations):
+        await run()
+    snapshot_after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated_blocks = sum(
+        max(stat.count_diff, 0)
+        for stat in snapshot_after.compare_to(snapshot_before, "lineno")
+    )
+
+    return {
+        "scenario": name,
+        "iterations": iterations,
+        "ops_per_second": round(iterations / elapsed, 1),
+        "mean_ms": round(elapsed / iterations * 1000, 3),
+        "p99_loop_lag_ms": round(p99_lag, 3),
+        "gc_collections": collections,
+        "retained_blocks_per_op": round(allocated_blocks / iterations, 1),
+        "peak_traced_kib": round(peak / 1024, 1),
+    }
+
+
+def _create_entry(user_id: str) -> ConfigEntry:
+    """Create a config entry, passing only what this Home Assistant accepts.
+
+    The entry is never added to Home Assistant, so it already carries the
+    user id that setup would otherwise store in it.
+    """
+
+    kwargs: dict[str, Any] = {
+        "version": 2,
+        "minor_version": 1,
+        "domain": DOMAIN,
+        "title": "Bench Rider",
+        "data": {
+            CONF_USERNAME: "bench_rider",
+            CONF_PASSWORD: "bench",
+            CONF_USER_ID: user_id,
+        },
+        "source": config_entries.SOURCE_USER,
+        "options": {},
+        "unique_id": "bench_rider",
+        "discovery_keys": {},
+        "subentries_data": None,
+    }
+    parameters = inspect.signature(ConfigEntry).parameters
+    return ConfigEntry(**{key: value for key, value in kwargs.items() if key in parameters})
+
+
+async def async_run(iterations: int, duration: int) -> list[dict[str, Any]]:
+    """Set up the integration against the replay server and run every scenario."""
+
+    fixtures = load_fixtures(duration)
+    server = ReplayServer(fixtures)
+    await server.async_start()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hass.config_entries = ConfigEntries(hass, {})
+        # Setup reads which sensors are disabled from the entity registry.
+        await dr.async_load(hass)
+        await er.async_load(hass)
+        entry = _create_entry(fixtures["me"]["id"])
+        if hasattr(entry, "_async_set_state"):
+            entry._async_set_state(hass, ConfigEntryState.SETUP_IN_PROGRESS, None)
+        config_entries.current_entry.set(entry)
+
+        with patch(
+            "custom_components.peloton.api.API_BASE_URL", server.base_url
+        ), patch(
+            "custom_components.peloton.api.AUTH_TOKEN_URL",
+            f"{server.base_url}/oauth/token",
+        ), patch.object(
+            hass.config_entries, "async_forward_entry_setups", AsyncMock()
+        ):
+            await async_setup_entry(hass, entry)
+            # Let the initial history sync finish before measuring.
+            await hass.async_block_till_done(wait_background_tasks=True)
+
+            coordinator = hass.data[DOMAIN][entry.entry_id]
+            entities: list[Any] = [PelotonLastWorkout(coordinator)] + [
+                PelotonStatSensor(coordinator, peloton_stat)
+                for peloton_stat in coordinator.data["quant_data"]
+                if isinstance(peloton_stat, PelotonStat)
+            ]
+            state_writes = 0
+
+            def count_write() -> None:
+                nonlocal state_writes
+                state_writes += 1
+
+            for index, entity in enumerate(entities):
+                entity.hass = hass
+                entity.entity_id = f"sensor.peloton_bench_{index}"
+                entity.async_write_ha_state = count_write
+
+            async def run_entity_updates() -> None:
+                for entity in entities:
+                    entity._handle_coordinator_update()
+
+            results = []
+            for status in ("COMPLETE", "IN_PROGRESS"):
+                server.status = status
+                data = await coordinator.update_method()
+                server.not_modified = 0
+                results.append(
+                    await async_measure(
+                        f"async_update_data ({status.lower()})",
+                        iterations,
+                        coordinator.update_method,
+                    )
+                )
+                results[-1]["not_modified_responses"] = server.not_modified
+                results.append(
+                    await async_measure(
+                        f"compile_quant_data ({status.lower()})",
+                        iterations,
+                        lambda data=data: compile_quant_data(
+                            workout_stats_summary=data["workout_stats_summary"],
+                            workout_stats_detail=data["workout_stats_detail"],
+                            user_profile=data["user_profile"],
+                            user_settings=fixtures["settings"],
+                        ),
+                    )
+                )
+                coordinator.data = data
+                state_writes = 0
+                results.append(
+                    await async_measure(
+                        f"entity updates ({status.lower()}, {len(entities)} entities)",
+                        iterations,
+                        run_entity_updates,
+                    )
+                )
+                results[-1]["state_writes"] = state_writes
+
+        await hass.async_stop(force=True)
+
+    await server.async_stop()
+    return results
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument(
+        "--duration", type=int, default=90, help="ride length in minutes"
+    )
+    parser.add_argument("--json", action="store_true", help="print JSON results")
+    args = parser.parse_args()
+
+    results = asyncio.run(async_run(args.iterations, args.duration))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for result in results:
+        print(
+            f"{result['scenario']:<48} {result['ops_per_second']:>9} ops/s"
+            f"  mean {result['mean_ms']:>8} ms"
+            f"  p99 loop lag {result['p99_loop_lag_ms']:>7} ms"
+            f"  gc {result['gc_collections']}"
+            f"  retained {result['retained_blocks_per_op']:>7} blocks/op"
+            f"  peak {result['peak_traced_kib']:>8} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
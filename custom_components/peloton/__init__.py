@@ -2,8 +2,14 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+import asyncio
+from collections.abc import Awaitable, Container
+from datetime import datetime, timedelta, tzinfo
+from functools import lru_cache
 import logging
+import sqlite3
+import time
+from typing import TypeVar
 
 from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
@@ -17,20 +23,60 @@ from homeassistant.const import (
     UnitOfSpeed,
     UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
-from pylotoncycle import PylotonCycle
-from pylotoncycle.pylotoncycle import PelotonLoginException
-from requests.exceptions import Timeout
 
-from .const import DOMAIN, STARTUP_MESSAGE
-from .sensor import PelotonMetric, PelotonStat, PelotonSummary, PelotonWorkouts
+from .aggregates import PelotonRollingAggregates
+from .analytics import analytics_stats, compute_workout_analytics
+from .api import (
+    PelotonAuthError,
+    PelotonCircuitOpenError,
+    PelotonConnectionError,
+    PelotonError,
+)
+from .cache import PelotonEndpointCache, PelotonWorkoutMemo, payload_fingerprint
+from .const import (
+    BATCH_MAX_CONCURRENT,
+    CONF_BATCH_MAX_CONCURRENT,
+    CONF_BATCH_POLLING,
+    CONF_DIAGNOSTIC_SENSORS,
+    CONF_USER_ID,
+    DATA_BATCH_SCHEDULER,
+    DATA_INSTRUMENTATION,
+    DOMAIN,
+    METRICS_EVERY_N_FULL,
+    METRICS_EVERY_N_LIVE,
+    STARTUP_MESSAGE,
+    UPDATE_INTERVAL_ACTIVE,
+    WORKOUT_DATETIMES_CACHE_SIZE,
+)
+from .events import PelotonWorkoutEvents
+from .history import (
+    PelotonHistorySync,
+    async_get_history_store,
+    history_workout_from_api,
+)
+from .instrumentation import PelotonInstrumentation
+from .scheduler import PelotonPollScheduler, async_get_batch_scheduler
+from .session import async_get_session_store, async_login
+from .sensor import (
+    PelotonMetric,
+    PelotonStat,
+    PelotonStatPool,
+    PelotonSummary,
+    PelotonWorkouts,
+    async_disabled_stat_keys,
+    stat_key,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
 PLATFORMS: list[str] = ["binary_sensor", "sensor"]
 
 
@@ -46,50 +92,226 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Fetch current state object
     _LOGGER.debug("Logging in and setting up session to the Peloton API")
     try:
-        api = await hass.async_add_executor_job(
-            PylotonCycle, entry.data[CONF_USERNAME], entry.data[CONF_PASSWORD]
+        api = await async_login(
+            hass, entry.data[CONF_USERNAME], entry.data[CONF_PASSWORD]
         )
-    except PelotonLoginException as err:
+    except PelotonAuthError as err:
         _LOGGER.error("Peloton username or password incorrect")
         raise ConfigEntryAuthFailed from err
-    except (ConnectionError, Timeout) as err:
-        raise UpdateFailed("Could not connect to Peloton.") from err
+    except PelotonError as err:
+        raise ConfigEntryNotReady("Could not connect to Peloton.") from err
+
+    if entry.data.get(CONF_USER_ID) != api.user_id:
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_USER_ID: api.user_id}
+        )
+
+    session_store = await async_get_session_store(hass)
+    scheduler = PelotonPollScheduler()
+    batch_polling: bool = entry.options.get(CONF_BATCH_POLLING, False)
+    endpoint_cache = PelotonEndpointCache()
+    workout_memo = PelotonWorkoutMemo()
+    stat_pool = PelotonStatPool()
+    instrumentation = PelotonInstrumentation()
+    instrumentation.add_cache("endpoints", endpoint_cache)
+    instrumentation.add_cache("workout_memo", workout_memo)
+    instrumentation.add_status("circuit_breaker", api.circuit_breaker.as_dict)
+    api.instrumentation = instrumentation
+    diagnostic_sensors: bool = entry.options.get(CONF_DIAGNOSTIC_SENSORS, False)
+    history_store = async_get_history_store(hass)
+    rolling_aggregates = PelotonRollingAggregates()
+    await rolling_aggregates.async_load(hass, history_store, api.user_id)
+    last_fingerprint: tuple | None = None
+    # Stats behind sensors disabled in the entity registry are not compiled.
+    disabled_keys = async_disabled_stat_keys(hass, entry)
 
     async def async_update_data() -> bool | dict:
+        nonlocal last_fingerprint
+
+        poll_started = time.monotonic()
+        fetch_timings: dict[str, float] = {}
+        api.reset_retry_budget()
+
+        async def async_fetch_latest_workout() -> tuple[dict, dict]:
+            """Fetch the latest workout and then its metrics."""
+            workout_stats_summary = await async_timed_call(
+                fetch_timings, "workouts", api.async_get_latest_workout()
+            )
 
+            # Metrics of a completed workout never change.
+            if (
+                workout_stats_detail := workout_memo.get_metrics(workout_stats_summary)
+            ) is None:
+                # Live stats only need the latest sample, so a coarse series is
+                # enough until the workout completes and a finer one is kept.
+                workout_stats_detail = await async_timed_call(
+                    fetch_timings,
+                    "performance_graph",
+                    api.async_get_performance_graph(
+                        workout_stats_summary["id"],
+                        METRICS_EVERY_N_FULL
+                        if workout_stats_summary.get("status") == "COMPLETE"
+                        else METRICS_EVERY_N_LIVE,
+                    ),
+                )
+                workout_memo.store_metrics(workout_stats_summary, workout_stats_detail)
+            return workout_stats_summary, workout_stats_detail
+
+        async def async_fetch_profile() -> tuple[dict, dict]:
+            """Fetch the user's profile and settings, served from cache if fresh."""
+            return await asyncio.gather(
+                endpoint_cache.async_get(
+                    "me",
+                    lambda: async_timed_call(fetch_timings, "me", api.async_get_me()),
+                ),
+                endpoint_cache.async_get(
+                    "settings",
+                    lambda: async_timed_call(
+                        fetch_timings, "settings", api.async_get_settings()
+                    ),
+                ),
+            )
+
+        # Only the metrics depend on the workout id, so everything else
+        # is fetched at the same time.
         try:
-            workouts = await hass.async_add_executor_job(api.GetRecentWorkouts, 1)
-            workout_stats_summary = workouts[0]
+            (
+                (workout_stats_summary, workout_stats_detail),
+                (user_profile, user_settings),
+            ) = await asyncio.gather(
+                async_fetch_latest_workout(),
+                async_fetch_profile(),
+            )
+
+            # Workout counts change with every new workout.
+            if endpoint_cache.check_workout_id(workout_stats_summary["id"]):
+                user_profile, user_settings = await async_fetch_profile()
         except IndexError as err:
             raise UpdateFailed("User has no workouts.") from err
-        except (ConnectionError, Timeout) as err:
+        except PelotonAuthError as err:
+            raise ConfigEntryAuthFailed from err
+        except PelotonCircuitOpenError as err:
+            raise UpdateFailed(str(err)) from err
+        except PelotonConnectionError as err:
             raise UpdateFailed("Could not connect to Peloton.") from err
+        except PelotonError as err:
+            raise UpdateFailed(str(err)) from err
 
-        workout_stats_summary_id = workout_stats_summary["id"]
-        user_profile = await hass.async_add_executor_job(api.GetMe)
-        user_settings = await hass.async_add_executor_job(api.GetSettings)
-        return {
-            "workout_stats_detail": (
-                workout_stats_detail := await hass.async_add_executor_job(
-                    api.GetWorkoutMetricsById, workout_stats_summary_id
+        _LOGGER.debug("Peloton API call timings: %s", fetch_timings)
+
+        # Keep the stored session current if the client refreshed its token.
+        session_store.async_update(entry.data[CONF_USERNAME], api)
+
+        # Poll quickly during a workout and back off while the user is idle.
+        # Batched accounts are refreshed by the shared batch scheduler instead.
+        interval = scheduler.next_interval(
+            workout_stats_summary["id"], workout_stats_summary.get("status")
+        )
+        if not batch_polling:
+            coordinator.update_interval = interval
+
+        # Rolling totals only change when a workout completes or ages out.
+        if (
+            workout_stats_summary.get("status") == "COMPLETE"
+            and "created_at" in workout_stats_summary
+        ):
+            rolling_aggregates.add_workout(
+                history_workout_from_api(
+                    workout_stats_summary, api.user_id, workout_stats_detail
                 )
-            ),
-            "workout_stats_summary": workout_stats_summary,
-            "user_profile": await hass.async_add_executor_job(api.GetMe),
-            "quant_data": await compile_quant_data(
+            )
+        rolling_aggregates.expire()
+
+        # Between rides every poll returns the same payloads. Hand back the
+        # previous data so nothing is compiled and, as it compares equal, no
+        # listener is called. Diagnostic sensors change with every poll.
+        fingerprint = payload_fingerprint(
+            workout_stats_summary, workout_stats_detail, user_profile, user_settings
+        )
+        if fingerprint is not None:
+            fingerprint += (rolling_aggregates.revision,)
+        if (
+            fingerprint is not None
+            and fingerprint == last_fingerprint
+            and coordinator.data
+            and not diagnostic_sensors
+        ):
+            instrumentation.record_poll(time.monotonic() - poll_started)
+            return coordinator.data
+        last_fingerprint = None
+
+        if (
+            quant_data := workout_memo.get_quant_data(
+                workout_stats_summary, user_profile, user_settings
+            )
+        ) is None:
+            compile_started = time.thread_time()
+            quant_data = await compile_quant_data(
                 workout_stats_summary=workout_stats_summary,
                 workout_stats_detail=workout_stats_detail,
                 user_profile=user_profile,
                 user_settings=user_settings,
-            ),
+                disabled_keys=disabled_keys,
+            )
+            instrumentation.record_compile(time.thread_time() - compile_started)
+            workout_memo.store_quant_data(
+                workout_stats_summary, user_profile, user_settings, quant_data
+            )
+
+        # Analytics run once per completed workout, off the event loop.
+        analytics = workout_memo.get_analytics(workout_stats_summary)
+        if analytics is None and workout_stats_summary.get("status") == "COMPLETE":
+            analytics = await hass.async_add_executor_job(
+                compute_workout_analytics,
+                workout_stats_detail,
+                METRICS_EVERY_N_FULL,
+                (workout_stats_summary.get("ftp_info") or {}).get("ftp"),
+                user_profile.get("customized_max_heart_rate")
+                or user_profile.get("default_max_heart_rate"),
+            )
+            workout_memo.store_analytics(workout_stats_summary, analytics)
+
+        instrumentation.record_poll(time.monotonic() - poll_started)
+
+        # Unchanged stats keep the instances from the previous poll. The index
+        # lets each sensor find its stat with a single lookup.
+        quant_data, quant_index = stat_pool.intern(
+            [
+                *quant_data,
+                *(
+                    peloton_stat
+                    for peloton_stat in (
+                        *rolling_aggregates.get_stats(
+                            user_settings.get("distance_unit")
+                        ),
+                        *analytics_stats(analytics),
+                        *(instrumentation.get_stats() if diagnostic_sensors else ()),
+                    )
+                    if peloton_stat.key not in disabled_keys
+                ),
+            ]
+        )
+
+        last_fingerprint = fingerprint
+        # fetch_timings goes first so the coordinator's equality check on
+        # fresh data stops there instead of walking the metrics.
+        return {
+            "fetch_timings": fetch_timings,
+            "workout_stats_detail": workout_stats_detail,
+            "workout_stats_summary": workout_stats_summary,
+            "user_profile": user_profile,
+            "quant_data": quant_data,
+            "quant_index": quant_index,
         }
-    
+
     coordinator = DataUpdateCoordinator(
         hass,
         _LOGGER,
         name=DOMAIN,
         update_method=async_update_data,
-        update_interval=timedelta(seconds=10),
+        update_interval=None if batch_polling else UPDATE_INTERVAL_ACTIVE,
+        # Listeners are only called when the data changed.
+        always_update=False,
     )
 
     # Fetch initial data so we have data when entities subscribe
@@ -100,6 +322,72 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Store coordinator
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    hass.data[DOMAIN].setdefault(DATA_INSTRUMENTATION, {})[
+        entry.entry_id
+    ] = instrumentation
+
+    @callback  # type: ignore
+    def async_filter_entity_registry_update(
+        event_data: er.EventEntityRegistryUpdatedData,
+    ) -> bool:
+        """Only pass on sensors of this entry being enabled or disabled."""
+
+        if event_data["action"] != "update" or "disabled_by" not in event_data.get(
+            "changes", {}
+        ):
+            return False
+        registry_entry = er.async_get(hass).async_get(event_data["entity_id"])
+        return (
+            registry_entry is not None
+            and registry_entry.config_entry_id == entry.entry_id
+        )
+
+    @callback  # type: ignore
+    def async_handle_entity_registry_update(event: Event) -> None:
+        """Compile stats for sensors that were enabled and drop disabled ones."""
+
+        nonlocal disabled_keys, last_fingerprint
+        if (keys := async_disabled_stat_keys(hass, entry)) == disabled_keys:
+            return
+        enabled_keys = disabled_keys - keys
+        disabled_keys = keys
+        workout_memo.invalidate_quant_data()
+        last_fingerprint = None
+        if enabled_keys:
+            hass.async_create_task(coordinator.async_request_refresh())
+
+    entry.async_on_unload(
+        hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED,
+            async_handle_entity_registry_update,
+            event_filter=async_filter_entity_registry_update,
+        )
+    )
+
+    if batch_polling:
+        async_get_batch_scheduler(hass).async_register(
+            entry.entry_id,
+            coordinator,
+            scheduler,
+            entry.options.get(CONF_BATCH_MAX_CONCURRENT, BATCH_MAX_CONCURRENT),
+        )
+
+    history_sync = PelotonHistorySync(hass, entry, coordinator, api, history_store)
+    # Pick up workouts from the first full sync, which finishes in the background.
+    entry.async_on_unload(
+        history_sync.async_add_listener(
+            lambda: entry.async_create_background_task(
+                hass,
+                rolling_aggregates.async_load(hass, history_store, api.user_id),
+                f"{entry.title} rolling totals",
+            )
+        )
+    )
+    history_sync.async_start()
+
+    PelotonWorkoutEvents(hass, entry, coordinator).async_start()
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -111,9 +399,38 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DOMAIN][DATA_INSTRUMENTATION].pop(entry.entry_id, None)
+        if batch_scheduler := hass.data[DOMAIN].get(DATA_BATCH_SCHEDULER):
+            batch_scheduler.async_unregister(entry.entry_id)
 
     return bool(unload_ok)
 
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the stored Peloton session and workout history of a removed entry."""
+    session_store = await async_get_session_store(hass)
+    await session_store.async_remove(entry.data[CONF_USERNAME])
+
+    # Another entry may log in to the same Peloton account with its email.
+    if not (user_id := entry.data.get(CONF_USER_ID)) or any(
+        other_entry.data.get(CONF_USER_ID) == user_id
+        for other_entry in hass.config_entries.async_entries(DOMAIN)
+        if other_entry.entry_id != entry.entry_id
+    ):
+        return
+    try:
+        await hass.async_add_executor_job(
+            async_get_history_store(hass).delete_workouts, user_id
+        )
+    except sqlite3.Error as err:
+        _LOGGER.warning("Could not delete the workout history: %s", err)
+
+
 async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Migrate old entry."""
 
@@ -128,6 +445,91 @@ async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     return True
 
+async def async_timed_call(
+    timings: dict[str, float], name: str, awaitable: Awaitable[_T]
+) -> _T:
+    """Await an API call and record how long it took."""
+
+    started = time.monotonic()
+    try:
+        return await awaitable
+    finally:
+        timings[name] = round(time.monotonic() - started, 3)
+
+
+# Workout summary slug -> (summary key, value type, device class).
+SUMMARY_SLUGS: dict[str, tuple[str, type, SensorDeviceClass | None]] = {
+    "total_calories": ("total_calories", int, None),
+    "calories": ("total_calories", int, None),
+    "active_calories": ("active_calories", int, None),
+    "distance": ("distance", float, SensorDeviceClass.DISTANCE),
+    "total_output": ("totaloutput", int, None),
+}
+
+# Workout metric slug -> (metric key, value type, unit, device class).
+# A unit of None uses the display unit returned by the API.
+METRIC_SLUGS: dict[str, tuple[str, type, str | None, SensorDeviceClass | None]] = {
+    "heart_rate": ("heart_rate", int, None, None),
+    "resistance": ("resistance", int, "%", None),
+    "speed": ("speed", float, None, SensorDeviceClass.SPEED),
+    "cadence": ("cadence", int, "rpm", None),
+    "output": ("output", int, "W", SensorDeviceClass.POWER),
+}
+
+# Profile workout count slug -> (sensor name, icon).
+WORKOUT_COUNT_STATS: dict[str, tuple[str, str]] = {
+    "bike_bootcamp": ("Bike Bootcamp count", "mdi:bike"),
+    "caesar": ("Rowing count", "mdi:rowing"),
+    "caesar_bootcamp": ("Row Bootcamp count", "mdi:rowing"),
+    "cardio": ("Cardio count", "mdi:heart"),
+    "circuit": ("Tread Bootcamp count", "mdi:run-fast"),
+    "cycling": ("Cycling count", "mdi:bike"),
+    "meditation": ("Meditation count", "mdi:meditation"),
+    "running": ("Running count", "mdi:run-fast"),
+    "strength": ("Strength count", "mdi:weight-lifter"),
+    "stretching": ("Stretching count", "mdi:gymnastics"),
+    "walking": ("Walking count", "mdi:walk"),
+    "yoga": ("Yoga count", "mdi:yoga"),
+}
+
+
+# Time zone name -> resolved zone. None marks a name that could not be resolved.
+_TIME_ZONES: dict[str, tzinfo | None] = {}
+
+
+async def async_resolve_time_zone(raw_tz: str | None) -> tzinfo | None:
+    """Return the time zone for a name, falling back to UTC.
+
+    Each name is only looked up once, so later polls never wait on zoneinfo.
+    """
+
+    name = raw_tz or "UTC"
+    if name not in _TIME_ZONES:
+        _TIME_ZONES[name] = await dt_util.async_get_time_zone(name)
+    return _TIME_ZONES[name]
+
+
+@lru_cache(maxsize=WORKOUT_DATETIMES_CACHE_SIZE)
+def workout_datetimes(
+    workout_id: str | None,
+    start_time: int | None,
+    end_time: int | None,
+    user_timezone: tzinfo | None,
+) -> tuple[datetime | None, datetime | None]:
+    """Convert a workout's start and end timestamps in the user's time zone.
+
+    Cached per workout, so unchanged polls reuse the same datetimes.
+    """
+    return (
+        datetime.fromtimestamp(start_time, user_timezone)
+        if start_time is not None
+        else None,
+        datetime.fromtimestamp(end_time, user_timezone)
+        if end_time is not None
+        else None,
+    )
+
+
 async def calculate_end_time(
         start_time: datetime.datetime | None,
         end_time: datetime.datetime | None,
@@ -152,9 +554,17 @@ async def calculate_end_time(
         
 
 async def compile_quant_data(
-    workout_stats_summary: dict, workout_stats_detail: dict, user_profile: dict, user_settings: dict
+    workout_stats_summary: dict,
+    workout_stats_detail: dict,
+    user_profile: dict,
+    user_settings: dict,
+    disabled_keys: Container[str] = frozenset(),
 ) -> list[PelotonStat]:
-    """Compiles list of quantative data."""
+    """Compiles list of quantative data.
+
+    Stats whose keys are in disabled_keys are left out, and workout counts
+    for them are not even read from the profile.
+    """
 
     # Used to tell stats dealing with "current" measurements (heart rate,
     # resistance, etc) to only return API value if a workout is in progress.
@@ -165,24 +575,15 @@ async def compile_quant_data(
     )
 
     # Get Timezone
-    user_timezone = (
-        await dt_util.async_get_time_zone(raw_tz)
-        if (raw_tz := workout_stats_summary.get("timezone"))
-        else await dt_util.async_get_time_zone("UTC")
+    user_timezone = await async_resolve_time_zone(
+        workout_stats_summary.get("timezone")
     )
 
-    start_time: datetime.datetime | None = (
-        datetime.fromtimestamp(workout_stats_summary["start_time"], user_timezone)
-        if "start_time" in workout_stats_summary
-        and workout_stats_summary["start_time"] is not None
-        else None
-    )
-    
-    end_time: datetime.datetime | None = (
-        datetime.fromtimestamp(workout_stats_summary["end_time"], user_timezone)
-        if "end_time" in workout_stats_summary
-        and workout_stats_summary["end_time"] is not None or not 'null'
-        else None
+    start_time, end_time = workout_datetimes(
+        workout_stats_summary.get("id"),
+        workout_stats_summary.get("start_time"),
+        workout_stats_summary.get("end_time"),
+        user_timezone,
     )
 
     workout_duration: int | None = (
@@ -205,253 +606,54 @@ async def compile_quant_data(
     summary: dict
     summaries: dict = {}
     for summary in workout_stats_detail.get("summaries", []):
-        if summary.get("slug") == "total_calories" or summary.get("slug") == "calories":
-            summaries.update(
-                {
-                    "total_calories": PelotonSummary(
-                        value  # Convert kcal to Wh
-                        if isinstance((value := summary.get("value")), int)
-                        else None,
-                        str(summary.get("display_unit")),
-                        None,
-                    )
-                }
-            )
-        if summary.get("slug") == "active_calories":
-            summaries.update(
-                {
-                    "active_calories": PelotonSummary(
-                        value  # Convert kcal to Wh
-                        if isinstance((value := summary.get("value")), int)
-                        else None,
-                        str(summary.get("display_unit")),
-                        None,
-                    )
-                }
-            )
-        if summary.get("slug") == "distance":
-            summaries.update(
-                {
-                    "distance": PelotonSummary(
-                        value
-                        if isinstance((value := summary.get("value")), float)
-                        else None,
-                        str(summary.get("display_unit")),
-                        SensorDeviceClass.DISTANCE,
-                    )
-                }
-            )
-        if summary.get("slug") == "total_output":
-            summaries.update(
-                {
-                    "totaloutput": PelotonSummary(
-                        value
-                        if isinstance((value := summary.get("value")), int)
-                        else None,
-                        str(summary.get("display_unit")),
-                        None,
-                    )
-                }
-            )
+        if (summary_spec := SUMMARY_SLUGS.get(summary.get("slug"))) is None:
+            continue
+        key, value_type, device_class = summary_spec
+        summaries[key] = PelotonSummary(
+            value if isinstance((value := summary.get("value")), value_type) else None,
+            str(summary.get("display_unit")),
+            device_class,
+        )
 
     # Preprocess Metrics
 
     metric: dict
     metrics: dict = {}
     for metric in workout_stats_detail.get("metrics", []):
-        if metric.get("slug") == "heart_rate":
-            metrics.update(
-                {
-                    "heart_rate": PelotonMetric(
-                        int(max_val)
-                        if isinstance((max_val := metric.get("max_value")), int)
-                        else None,
-                        int(avg_val)
-                        if isinstance((avg_val := metric.get("average_value")), int)
-                        else None,
-                        int(val)
-                        if metric.get("values") and isinstance((val := metric.get("values")[len(metric.get("values"))-1]), int)
-                        else None,
-                        str(metric.get("display_unit")),
-                        None,
-                    )
-                }
-            )
-        if metric.get("slug") == "resistance":
-            metrics.update(
-                {
-                    "resistance": PelotonMetric(
-                        int(max_val)
-                        if isinstance((max_val := metric.get("max_value")), int)
-                        else None,
-                        int(avg)
-                        if isinstance((avg := metric.get("average_value")), int)
-                        else None,
-                        int(value)
-                        if metric.get("values") and isinstance((value := metric.get("values")[len(metric.get("values"))-1]), int)
-                        else None,
-                        "%",
-                        None,
-                    )
-                }
-            )
-        if metric.get("slug") == "speed":
-            metrics.update(
-                {
-                    "speed": PelotonMetric(
-                        max_val
-                        if isinstance((max_val := metric.get("max_value")), float)
-                        else None,
-                        avg
-                        if isinstance((avg := metric.get("average_value")), float)
-                        else None,
-                        value
-                        if metric.get("values") and isinstance((value := metric.get("values")[len(metric.get("values"))-1]), float)
-                        else None,
-                        str(metric.get("display_unit")),
-                        SensorDeviceClass.SPEED,
-                    )
-                }
-            )
-        if metric.get("slug") == "cadence":
-            metrics.update(
-                {
-                    "cadence": PelotonMetric(
-                        int(max_val)
-                        if isinstance((max_val := metric.get("max_value")), int)
-                        else None,
-                        int(avg)
-                        if isinstance((avg := metric.get("average_value")), int)
-                        else None,
-                        int(value)
-                        if metric.get("values") and isinstance((value := metric.get("values")[len(metric.get("values"))-1]), int)
-                        else None,
-                        "rpm",
-                        None,
-                    )
-                }
-            )
-        if metric.get("slug") == "output":
-            metrics.update(
-                {
-                    "output": PelotonMetric(
-                        int(max_val)
-                        if isinstance((max_val := metric.get("max_value")), int)
-                        else None,
-                        int(avg)
-                        if isinstance((avg := metric.get("average_value")), int)
-                        else None,
-                        int(value)
-                        if metric.get("values") and isinstance((value := metric.get("values")[len(metric.get("values"))-1]), int)
-                        else None,
-                        "W",
-                        SensorDeviceClass.POWER,
-                    )
-                }
-            )
+        if (metric_spec := METRIC_SLUGS.get(metric.get("slug"))) is None:
+            continue
+        key, value_type, unit, device_class = metric_spec
+        values = metric.get("values")
+        metrics[key] = PelotonMetric(
+            value_type(max_val)
+            if isinstance((max_val := metric.get("max_value")), value_type)
+            else None,
+            value_type(avg_val)
+            if isinstance((avg_val := metric.get("average_value")), value_type)
+            else None,
+            value_type(val)
+            if values and isinstance((val := values[-1]), value_type)
+            else None,
+            unit or str(metric.get("display_unit")),
+            device_class,
+        )
 
     # Preprocess Workout Counts
+
+    workout_count_stats = {
+        slug: spec
+        for slug, spec in WORKOUT_COUNT_STATS.items()
+        if stat_key(spec[0]) not in disabled_keys
+    }
+    workout: dict
     workouts: dict = {}
-    for workout in user_profile.get("workout_counts", []):
-        if workout.get("slug") == "bike_bootcamp":
-            workouts.update(
-                {
-                    "bike_bootcamp": PelotonWorkouts(
-                        workout.get("count")
-                    )
-                }
-            )
-        if workout.get("slug") == "caesar":
-            workouts.update(
-                {
-                    "rowing": PelotonWorkouts(
-                        workout.get("count")
-                    )
-                }
-            )
-        if workout.get("slug") == "caesar_bootcamp":
-            workouts.update(
-                {
-                    "row_bootcamp": PelotonWorkouts(
-                        workout.get("count")
-                    )
-                }
-            )
-        if workout.get("slug") == "cardio":
-            workouts.update(
-                {
-                    "cardio": PelotonWorkouts(
-                        workout.get("count")
-                    )
-                }
-            )
-        if workout.get("slug") == "circuit":
-            workouts.update(
-                {
-                    "tread_bootcamp": PelotonWorkouts(
-                        workout.get("count")
-                    )
-                }
-            )
-        if workout.get("slug") == "cycling":
-            workouts.update(
-                {
-                    "cycling": PelotonWorkouts(
-                        workout.get("count")
-                    )
-                }
-            )
-        if workout.get("slug") == "meditation":
-            workouts.update(
-                {
-                    "meditation": PelotonWorkouts(
-                        workout.get("count")
-                    )
-                }
-            )
-        if workout.get("slug") == "running":
-            workouts.update(
-                {
-                    "running": PelotonWorkouts(
-                        workout.get("count")
-                    )
-                }
-            )
-        if workout.get("slug") == "strength":
-            workouts.update(
-                {
-                    "strength": PelotonWorkouts(
-                        workout.get("count")
-                    )
-                }
-            )
-        if workout.get("slug") == "stretching":
-            workouts.update(
-                {
-                    "stretching": PelotonWorkouts(
-                        workout.get("count")
-                    )
-                }
-            )
-        if workout.get("slug") == "walking":
-            workouts.update(
-                {
-                    "walking": PelotonWorkouts(
-                        workout.get("count")
-                    )
-                }
-            )
-        if workout.get("slug") == "yoga":
-            workouts.update(
-                {
-                    "yoga": PelotonWorkouts(
-                        workout.get("count")
-                    )
-                }
-            )
+    if workout_count_stats:
+        for workout in user_profile.get("workout_counts", []):
+            if (slug := workout.get("slug")) in workout_count_stats:
+                workouts[slug] = PelotonWorkouts(workout.get("count"))
 
     # Build and return list.
-    return [
+    quant_data = [
         PelotonStat(
             "Start Time",
             start_time,
@@ -640,100 +842,21 @@ async def compile_quant_data(
             SensorStateClass.MEASUREMENT,
             "mdi:fan-clock",
         ),
-        PelotonStat(
-            "Bike Bootcamp count",
-            getattr(workouts.get("bike_bootcamp"), "count", None),
-            state_class=SensorStateClass.TOTAL_INCREASING,
-            icon="mdi:bike",
-            entity_category=EntityCategory.DIAGNOSTIC,
-            entity_registry_enabled_default=False,
-        ),
-        PelotonStat(
-            name="Rowing count",
-            native_value=getattr(workouts.get("rowing"), "count", None),
-            state_class=SensorStateClass.TOTAL_INCREASING,
-            icon="mdi:rowing",
-            entity_category=EntityCategory.DIAGNOSTIC,
-            entity_registry_enabled_default=False,
-        ),
-        PelotonStat(
-            name="Row Bootcamp count",
-            native_value=getattr(workouts.get("row_bootcamp"), "count", None),
-            state_class=SensorStateClass.TOTAL_INCREASING,
-            icon="mdi:rowing",
-            entity_category=EntityCategory.DIAGNOSTIC,
-            entity_registry_enabled_default=False,
-        ),
-        PelotonStat(
-            name="Cardio count",
-            native_value=getattr(workouts.get("cardio"), "count", None),
-            state_class=SensorStateClass.TOTAL_INCREASING,
-            icon="mdi:heart",
-            entity_category=EntityCategory.DIAGNOSTIC,
-            entity_registry_enabled_default=False,
-        ),
-        PelotonStat(
-            name="Tread Bootcamp count",
-            native_value=getattr(workouts.get("tread_bootcamp"), "count", None),
-            state_class=SensorStateClass.TOTAL_INCREASING,
-            icon="mdi:run-fast",
-            entity_category=EntityCategory.DIAGNOSTIC,
-            entity_registry_enabled_default=False,
-        ),
-        PelotonStat(
-            name="Cycling count",
-            native_value=getattr(workouts.get("cycling"), "count", None),
-            state_class=SensorStateClass.TOTAL_INCREASING,
-            icon="mdi:bike",
-            entity_category=EntityCategory.DIAGNOSTIC,
-            entity_registry_enabled_default=False,
-        ),
-        PelotonStat(
-            name="Meditation count",
-            native_value=getattr(workouts.get("meditation"), "count", None),
-            state_class=SensorStateClass.TOTAL_INCREASING,
-            icon="mdi:meditation",
-            entity_category=EntityCategory.DIAGNOSTIC,
-            entity_registry_enabled_default=False,
-        ),
-        PelotonStat(
-            name="Running count",
-            native_value=getattr(workouts.get("running"), "count", None),
-            state_class=SensorStateClass.TOTAL_INCREASING,
-            icon="mdi:run-fast",
-            entity_category=EntityCategory.DIAGNOSTIC,
-            entity_registry_enabled_default=False,
-        ),
-        PelotonStat(
-            name="Strength count",
-            native_value=getattr(workouts.get("strength"), "count", None),
-            state_class=SensorStateClass.TOTAL_INCREASING,
-            icon="mdi:weight-lifter",
-            entity_category=EntityCategory.DIAGNOSTIC,
-            entity_registry_enabled_default=False,
-        ),
-        PelotonStat(
-            name="Stretching count",
-            native_value=getattr(workouts.get("stretching"), "count", None),
-            state_class=SensorStateClass.TOTAL_INCREASING,
-            icon="mdi:gymnastics",
-            entity_category=EntityCategory.DIAGNOSTIC,
-            entity_registry_enabled_default=False,
-        ),
-        PelotonStat(
-            name="Walking count",
-            native_value=getattr(workouts.get("walking"), "count", None),
-            state_class=SensorStateClass.TOTAL_INCREASING,
-            icon="mdi:walk",
-            entity_category=EntityCategory.DIAGNOSTIC,
-            entity_registry_enabled_default=False,
-        ),
-        PelotonStat(
-            name="Yoga count",
-            native_value=getattr(workouts.get("yoga"), "count", None),
+    ]
+    if disabled_keys:
+        quant_data = [
+            peloton_stat
+            for peloton_stat in quant_data
+            if peloton_stat.key not in disabled_keys
+        ]
+    return quant_data + [
+        PelotonStat(
+            name=name,
+            native_value=getattr(workouts.get(slug), "count", None),
             state_class=SensorStateClass.TOTAL_INCREASING,
-            icon="mdi:yoga",
+            icon=icon,
             entity_category=EntityCategory.DIAGNOSTIC,
             entity_registry_enabled_default=False,
-        ),
+        )
+        for slug, (name, icon) in workout_count_stats.items()
     ]
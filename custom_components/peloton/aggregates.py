@@ -0,0 +1,190 @@
+"""Rolling totals over the last days of workout history."""
+from __future__ import annotations
+
+from bisect import insort
+from collections import deque
+from datetime import timedelta
+import logging
+import sqlite3
+import time
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+from homeassistant.const import UnitOfLength
+from homeassistant.core import HomeAssistant
+from homeassistant.util.unit_conversion import DistanceConverter
+
+from .const import AGGREGATE_WINDOWS
+from .history import PelotonHistoryStore, PelotonHistoryWorkout
+from .sensor import PelotonStat
+
+_LOGGER = logging.getLogger(__name__)
+
+# Aggregated field -> (sensor name prefix, icon). Values are summed in this order.
+AGGREGATE_FIELDS: dict[str, tuple[str, str]] = {
+    "output": ("Output", "mdi:lightning-bolt"),
+    "calories": ("Calories", "mdi:fire"),
+    "distance": ("Distance", "mdi:map-marker-distance"),
+}
+
+
+def _aggregate_values(workout: PelotonHistoryWorkout) -> tuple[float, ...]:
+    """Return a workout's values in AGGREGATE_FIELDS order.
+
+    Distances are stored in the unit the workout was recorded in, so they
+    are summed in kilometers and converted to the profile's unit on output.
+    """
+
+    distance = workout.distance or 0
+    if distance and workout.distance_unit == UnitOfLength.MILES:
+        distance = DistanceConverter.convert(
+            distance, UnitOfLength.MILES, UnitOfLength.KILOMETERS
+        )
+    return (
+        (workout.total_work or 0) / 1000,  # Converts joules to kJ
+        workout.calories or 0,
+        distance,
+    )
+
+
+class PelotonRollingWindow:
+    """Running totals of the workouts created within a trailing window.
+
+    Workouts are added once and dropped from the front as they age out, so
+    keeping the totals current costs O(1) per workout rather than a rescan.
+    """
+
+    def __init__(self, window: timedelta) -> None:
+        """Initialize the window."""
+        self.window = window
+        self._entries: deque[tuple[int, str, tuple[float, ...]]] = deque()
+        self.totals: list[float] = [0.0] * len(AGGREGATE_FIELDS)
+
+    def add(self, created_at: int, workout_id: str, values: tuple[float, ...]) -> None:
+        """Add a workout's values if it falls within the window."""
+
+        if created_at < time.time() - self.window.total_seconds():
+            return
+        entry = (created_at, workout_id, values)
+        if self._entries and created_at < self._entries[-1][0]:
+            # Only history loaded out of order lands here.
+            insort(self._entries, entry)
+        else:
+            self._entries.append(entry)
+        for index, value in enumerate(values):
+            self.totals[index] += value
+
+    def expire(self, now: float) -> list[str]:
+        """Drop workouts older than the window and return their ids."""
+
+        expired: list[str] = []
+        cutoff = now - self.window.total_seconds()
+        while self._entries and self._entries[0][0] < cutoff:
+            _, workout_id, values = self._entries.popleft()
+            for index, value in enumerate(values):
+                self.totals[index] -= value
+            expired.append(workout_id)
+        if not self._entries:
+            # Clear any floating point drift left by the subtractions.
+            self.totals = [0.0] * len(AGGREGATE_FIELDS)
+        return expired
+
+
+class PelotonRollingAggregates:
+    """Output, calories and distance totals for each of AGGREGATE_WINDOWS.
+
+    Seeded from the local workout history, then fed each newly completed
+    workout by the coordinator. Workouts are counted once by id.
+    """
+
+    def __init__(self, windows: tuple[timedelta, ...] = AGGREGATE_WINDOWS) -> None:
+        """Initialize the aggregates."""
+        self.windows = [PelotonRollingWindow(window) for window in windows]
+        self._longest = max(self.windows, key=lambda window: window.window)
+        self._workout_ids: set[str] = set()
+        # Bumped whenever a workout is added or expires, so callers can tell
+        # the totals changed without comparing them.
+        self.revision = 0
+
+    def add_workout(self, workout: PelotonHistoryWorkout) -> bool:
+        """Add a completed workout. Return False if it was already counted."""
+
+        if workout.workout_id in self._workout_ids or (
+            workout.created_at < time.time() - self._longest.window.total_seconds()
+        ):
+            return False
+        self._workout_ids.add(workout.workout_id)
+        self.revision += 1
+        values = _aggregate_values(workout)
+        for window in self.windows:
+            window.add(workout.created_at, workout.workout_id, values)
+        return True
+
+    def expire(self, now: float | None = None) -> None:
+        """Drop workouts that have aged out of each window."""
+
+        now = time.time() if now is None else now
+        for window in self.windows:
+            if not (expired := window.expire(now)):
+                continue
+            self.revision += 1
+            if window is self._longest:
+                self._workout_ids.difference_update(expired)
+
+    async def async_load(
+        self, hass: HomeAssistant, history_store: PelotonHistoryStore, user_id: str
+    ) -> int:
+        """Add stored workouts from the longest window and return how many.
+
+        The totals are optional, so a history database that cannot be read
+        is logged and the totals start from the workouts polled from now on.
+        """
+
+        try:
+            workouts = await hass.async_add_executor_job(
+                history_store.get_workouts,
+                user_id,
+                int(time.time() - self._longest.window.total_seconds()),
+            )
+        except sqlite3.Error as err:
+            _LOGGER.warning("Could not load workout history for rolling totals: %s", err)
+            return 0
+        added = sum(self.add_workout(workout) for workout in workouts)
+        _LOGGER.debug("Loaded %s workouts into the rolling totals", added)
+        return added
+
+    def get_stats(self, distance_unit: str | None) -> list[PelotonStat]:
+        """Return a stat for each field and window."""
+
+        distance_uom = (
+            UnitOfLength.MILES
+            if distance_unit == "imperial"
+            else UnitOfLength.KILOMETERS
+            if distance_unit == "metric"
+            else None
+        )
+        units: dict[str, tuple[str | None, SensorDeviceClass | None]] = {
+            "output": ("kJ", None),
+            "calories": ("kcal", None),
+            "distance": (distance_uom, SensorDeviceClass.DISTANCE),
+        }
+        return [
+            PelotonStat(
+                f"{name}: Last {window.window.days} Days",
+                round(
+                    DistanceConverter.convert(
+                        window.totals[index],
+                        UnitOfLength.KILOMETERS,
+                        UnitOfLength.MILES,
+                    )
+                    if field == "distance" and distance_uom == UnitOfLength.MILES
+                    else window.totals[index],
+                    2,
+                ),
+                units[field][0],
+                units[field][1],
+                SensorStateClass.MEASUREMENT,
+                icon,
+            )
+            for window in self.windows
+            for index, (field, (name, icon)) in enumerate(AGGREGATE_FIELDS.items())
+        ]
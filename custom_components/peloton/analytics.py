@@ -0,0 +1,183 @@
+"""Training load analytics over a completed workout's metric series."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import logging
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+from homeassistant.const import REVOLUTIONS_PER_MINUTE, UnitOfPower, UnitOfTime
+import numpy as np
+
+from .const import (
+    ANALYTICS_HEART_RATE_ZONES,
+    ANALYTICS_POWER_CURVE,
+    ANALYTICS_ROLLING_POWER,
+)
+from .sensor import PelotonStat
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class PelotonWorkoutAnalytics:
+    """Training load figures for one completed workout."""
+
+    normalized_power: float | None = None
+    variability_index: float | None = None
+    intensity_factor: float | None = None
+    training_stress_score: float | None = None
+    pedaling_cadence: float | None = None
+    # Zone number -> minutes spent in the zone.
+    heart_rate_zones: dict[int, float] = field(default_factory=dict)
+    # Duration in seconds -> best average watts held for that long.
+    power_curve: dict[int, int] = field(default_factory=dict)
+
+
+def _series(workout_stats_detail: dict, slug: str) -> np.ndarray:
+    """Return a metric's samples as a float array, with gaps as zero."""
+
+    metric: dict
+    for metric in workout_stats_detail.get("metrics", []):
+        if metric.get("slug") == slug:
+            return np.array(
+                [value or 0 for value in metric.get("values") or []], dtype=float
+            )
+    return np.zeros(0)
+
+
+def _best_rolling_mean(series: np.ndarray, samples: int) -> float | None:
+    """Return the highest mean over any samples consecutive values."""
+
+    if samples < 1 or len(series) < samples:
+        return None
+    cumsum = np.concatenate(([0.0], np.cumsum(series)))
+    return float(np.max(cumsum[samples:] - cumsum[:-samples]) / samples)
+
+
+def compute_workout_analytics(
+    workout_stats_detail: dict,
+    every_n: int,
+    ftp: int | None,
+    max_heart_rate: int | None,
+) -> PelotonWorkoutAnalytics:
+    """Compute analytics from metrics sampled every every_n seconds.
+
+    Normalized power is the fourth root of the mean of the fourth power of
+    the 30 second rolling average. Intensity factor and TSS need the FTP,
+    heart rate zones the maximum heart rate. This is CPU bound, so call it
+    from the executor.
+    """
+
+    analytics = PelotonWorkoutAnalytics()
+    output = _series(workout_stats_detail, "output")
+    heart_rate = _series(workout_stats_detail, "heart_rate")
+    cadence = _series(workout_stats_detail, "cadence")
+
+    rolling_samples = max(1, int(ANALYTICS_ROLLING_POWER.total_seconds()) // every_n)
+    if len(output) >= rolling_samples and output.any():
+        rolling = np.convolve(
+            output, np.ones(rolling_samples) / rolling_samples, mode="valid"
+        )
+        normalized_power = float(np.mean(rolling**4) ** 0.25)
+        analytics.normalized_power = round(normalized_power, 1)
+        analytics.variability_index = round(
+            normalized_power / float(np.mean(output)), 2
+        )
+
+        if ftp:
+            intensity_factor = normalized_power / ftp
+            duration = len(output) * every_n
+            analytics.intensity_factor = round(intensity_factor, 2)
+            analytics.training_stress_score = round(
+                duration * normalized_power * intensity_factor / (ftp * 3600) * 100, 1
+            )
+
+        for duration_td in ANALYTICS_POWER_CURVE:
+            seconds = int(duration_td.total_seconds())
+            if (best := _best_rolling_mean(output, seconds // every_n)) is not None:
+                analytics.power_curve[seconds] = round(best)
+
+    if max_heart_rate and heart_rate.any():
+        bounds = np.array(ANALYTICS_HEART_RATE_ZONES) * max_heart_rate
+        counts = np.bincount(
+            np.searchsorted(bounds, heart_rate[heart_rate > 0], side="right"),
+            minlength=len(bounds) + 1,
+        )
+        analytics.heart_rate_zones = {
+            zone: round(int(count) * every_n / 60, 1)
+            for zone, count in enumerate(counts, start=1)
+        }
+
+    if (pedaling := cadence[cadence > 0]).size:
+        analytics.pedaling_cadence = round(float(np.mean(pedaling)), 1)
+
+    return analytics
+
+
+def _power_curve_name(seconds: int) -> str:
+    """Return an attribute name like best_5s_power or best_20min_power."""
+    if seconds < 60:
+        return f"best_{seconds}s_power"
+    return f"best_{seconds // 60}min_power"
+
+
+def analytics_stats(analytics: PelotonWorkoutAnalytics | None) -> list[PelotonStat]:
+    """Return the stats exposing a workout's analytics.
+
+    Values are None until the latest workout has completed.
+    """
+
+    analytics = analytics or PelotonWorkoutAnalytics()
+    return [
+        PelotonStat(
+            "Normalized Power",
+            analytics.normalized_power,
+            UnitOfPower.WATT,
+            SensorDeviceClass.POWER,
+            SensorStateClass.MEASUREMENT,
+            "mdi:lightning-bolt-circle",
+            attributes=(
+                ("variability_index", analytics.variability_index),
+                *(
+                    (_power_curve_name(seconds), watts)
+                    for seconds, watts in analytics.power_curve.items()
+                ),
+            ),
+        ),
+        PelotonStat(
+            "Intensity Factor",
+            analytics.intensity_factor,
+            None,
+            None,
+            SensorStateClass.MEASUREMENT,
+            "mdi:gauge",
+        ),
+        PelotonStat(
+            "Training Stress Score",
+            analytics.training_stress_score,
+            None,
+            None,
+            SensorStateClass.MEASUREMENT,
+            "mdi:chart-bell-curve-cumulative",
+        ),
+        PelotonStat(
+            "Cadence: Pedaling Average",
+            analytics.pedaling_cadence,
+            REVOLUTIONS_PER_MINUTE,
+            None,
+            SensorStateClass.MEASUREMENT,
+            "mdi:fan",
+            entity_registry_enabled_default=False,
+        ),
+    ] + [
+        PelotonStat(
+            f"Heart Rate: Zone {zone}",
+            analytics.heart_rate_zones.get(zone),
+            UnitOfTime.MINUTES,
+            SensorDeviceClass.DURATION,
+            SensorStateClass.MEASUREMENT,
+            "mdi:heart-cog",
+            entity_registry_enabled_default=False,
+        )
+        for zone in range(1, len(ANALYTICS_HEART_RATE_ZONES) + 2)
+    ]
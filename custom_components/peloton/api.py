@@ -0,0 +1,420 @@
+"""Asynchronous client for the Peloton API."""
+from __future__ import annotations
+
+import asyncio
+from contextvars import ContextVar
+from dataclasses import dataclass
+import logging
+import re
+import time
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+from aiohttp import hdrs
+from homeassistant.util.json import json_loads
+
+from .breaker import PelotonCircuitBreaker
+from .const import (
+    API_BASE_URL,
+    AUTH_CLIENT_ID,
+    AUTH_REDIRECT_URI,
+    AUTH_TOKEN_URL,
+    REQUEST_RETRIES,
+    REQUEST_RETRY_BUDGET,
+    REQUEST_RETRY_DELAY,
+    REQUEST_TIMEOUT,
+)
+
+if TYPE_CHECKING:
+    from .instrumentation import PelotonInstrumentation
+
+_LOGGER = logging.getLogger(__name__)
+
+# Path segments that are ids, e.g. a 32 character hex workout id.
+_ID_SEGMENT = re.compile(r"/[0-9a-f]{16,}(?=/|$)|/\d+(?=/|$)")
+
+
+# Retries left for the requests of the current poll or history sync. The
+# budget lives in the running task's context, so a history sync in the
+# background has its own and cannot use up the polls'.
+_RETRY_BUDGET: ContextVar[list[int]] = ContextVar("peloton_retry_budget")
+
+
+def endpoint_name(path: str) -> str:
+    """Return a path with its ids replaced, e.g. /api/workout/{id}."""
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+class PelotonError(Exception):
+    """Base error for the Peloton API."""
+
+
+class PelotonAuthError(PelotonError):
+    """Credentials or tokens were rejected."""
+
+
+class PelotonConnectionError(PelotonError):
+    """Peloton could not be reached."""
+
+
+class PelotonRateLimitError(PelotonError):
+    """Peloton asked us to slow down (429). Retry later, don't reauthenticate."""
+
+
+class PelotonCircuitOpenError(PelotonConnectionError):
+    """Requests are paused because Peloton recently could not be reached."""
+
+
+@dataclass
+class _RequestInfo:
+    """What happened to one GET request, for instrumentation."""
+
+    retries: int = 0
+    payload_bytes: int = 0
+    failed: bool = True
+    not_modified: bool = False
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+@dataclass
+class _Validator:
+    """Validators and the decoded body of the last response from a path."""
+
+    params: dict[str, Any] | None
+    etag: str | None
+    last_modified: str | None
+    data: Any
+
+
+class PelotonApiClient:
+    """Talk to the Peloton API on Home Assistant's shared aiohttp session.
+
+    Authenticates with the same OAuth flow as pylotoncycle. An expired access
+    token is refreshed, or the account logged in again, the first time a
+    request comes back with 401.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        username: str,
+        password: str,
+        access_token: str | None = None,
+        refresh_token: str | None = None,
+    ) -> None:
+        """Initialize the client."""
+        self._session = session
+        self._username = username
+        self._password = password
+        self._access_token = access_token
+        self._refresh_token = refresh_token
+        self._auth_lock = asyncio.Lock()
+        self._instructor_names: dict[str, str | None] = {}
+        self._validators: dict[str, _Validator] = {}
+        self.username: str = username
+        self.user_id: str | None = None
+        self.instrumentation: PelotonInstrumentation | None = None
+        self.circuit_breaker = PelotonCircuitBreaker()
+
+    @property
+    def auth_info(self) -> dict[str, str | None]:
+        """Return the tokens needed to resume this session later."""
+        return {
+            "access_token": self._access_token,
+            "refresh_token": self._refresh_token,
+        }
+
+    async def async_login(self) -> None:
+        """Log in with username and password."""
+
+        _LOGGER.debug("Logging in to Peloton as %s", self._username)
+        await self._async_request_token(
+            {
+                "grant_type": "password",
+                "client_id": AUTH_CLIENT_ID,
+                "scope": "offline_access openid",
+                "username": self._username,
+                "password": self._password,
+            }
+        )
+
+    async def _async_refresh_access_token(self, rejected_token: str | None) -> None:
+        """Get a new access token, logging in again if refreshing fails."""
+
+        async with self._auth_lock:
+            # Another request already replaced the rejected token.
+            if self._access_token != rejected_token:
+                return
+
+            if self._refresh_token:
+                try:
+                    await self._async_request_token(
+                        {
+                            "grant_type": "refresh_token",
+                            "client_id": AUTH_CLIENT_ID,
+                            "refresh_token": self._refresh_token,
+                            "redirect_uri": AUTH_REDIRECT_URI,
+                        }
+                    )
+                    return
+                except PelotonAuthError:
+                    _LOGGER.debug("Refreshing Peloton token failed, logging in again")
+
+            await self.async_login()
+
+    async def _async_request_token(self, payload: dict[str, str]) -> None:
+        """Request tokens from Peloton's OAuth endpoint."""
+
+        try:
+            async with self._session.post(
+                AUTH_TOKEN_URL,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            ) as resp:
+                if resp.status >= 500:
+                    raise PelotonConnectionError(f"Peloton returned {resp.status}")
+                if resp.status == 429:
+                    raise PelotonRateLimitError(
+                        "Peloton is rate limiting logins, try again later"
+                    )
+                if resp.status != 200:
+                    raise PelotonAuthError(
+                        f"Could not obtain a Peloton access token ({resp.status})"
+                    )
+                data: dict = json_loads(await resp.read())
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            raise PelotonConnectionError("Could not connect to Peloton.") from err
+
+        self._access_token = data["access_token"]
+        self._refresh_token = data.get("refresh_token") or self._refresh_token
+
+    def reset_retry_budget(self, budget: int = REQUEST_RETRY_BUDGET) -> None:
+        """Allow budget more retries for requests made from the current task.
+
+        Called at the start of a poll or sync. Tasks it starts afterwards,
+        e.g. with asyncio.gather, share the same budget.
+        """
+        _RETRY_BUDGET.set([budget])
+
+    def _check_circuit_breaker(self) -> None:
+        """Raise if the circuit breaker is holding requests back."""
+        if not self.circuit_breaker.allow_request():
+            raise PelotonCircuitOpenError(
+                "Peloton is unavailable, next attempt in "
+                f"{self.circuit_breaker.next_probe_in:.0f} seconds"
+            )
+
+    async def async_get(
+        self,
+        path: str,
+        params: dict[str, Any] | None = None,
+        conditional: bool = False,
+    ) -> Any:
+        """GET an API path and return the decoded JSON body.
+
+        Connection errors, timeouts and server errors are retried, within
+        the retry budget. Requests are refused without touching the network
+        while the circuit breaker is open.
+
+        A conditional GET sends the ETag and Last-Modified of the previous
+        response from the same path and parameters. On 304 the object
+        decoded last time is returned as is, so it must not be modified.
+        """
+
+        self._check_circuit_breaker()
+        started = time.monotonic()
+        request = _RequestInfo()
+        headers: dict[str, str] = {}
+        if (
+            conditional
+            and (validator := self._validators.get(path)) is not None
+            and validator.params == params
+        ):
+            if validator.etag is not None:
+                headers["If-None-Match"] = validator.etag
+            if validator.last_modified is not None:
+                headers["If-Modified-Since"] = validator.last_modified
+        try:
+            try:
+                body = await self._async_get_body(path, params, request, headers)
+            except PelotonConnectionError:
+                self.circuit_breaker.record_failure()
+                raise
+            except PelotonError:
+                # Peloton answered, even if not with what we wanted.
+                self.circuit_breaker.record_success()
+                raise
+            except BaseException:
+                self.circuit_breaker.release()
+                raise
+            self.circuit_breaker.record_success()
+            if request.not_modified:
+                data = self._validators[path].data
+            else:
+                data = self._decode(path, body)
+                if conditional and (request.etag or request.last_modified):
+                    self._validators[path] = _Validator(
+                        params, request.etag, request.last_modified, data
+                    )
+            request.failed = False
+            return data
+        finally:
+            if self.instrumentation is not None:
+                self.instrumentation.record_request(
+                    endpoint_name(path),
+                    time.monotonic() - started,
+                    request.payload_bytes,
+                    request.retries,
+                    request.failed,
+                    request.not_modified,
+                )
+
+    async def _async_get_body(
+        self,
+        path: str,
+        params: dict[str, Any] | None,
+        request: _RequestInfo,
+        headers: dict[str, str],
+    ) -> bytes:
+        """GET an API path with retries and return the raw body.
+
+        A 304 only comes back when validators were sent in headers, and is
+        flagged on request with an empty body.
+        """
+
+        if not self._access_token:
+            await self._async_refresh_access_token(None)
+
+        reauthenticated = False
+        while True:
+            access_token = self._access_token
+            error: Exception | None = None
+            try:
+                async with self._session.get(
+                    f"{API_BASE_URL}{path}",
+                    params=params,
+                    headers={**headers, "Authorization": f"Bearer {access_token}"},
+                    timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+                ) as resp:
+                    status = resp.status
+                    body = await resp.read() if status < 400 else b""
+                    request.etag = resp.headers.get(hdrs.ETAG)
+                    request.last_modified = resp.headers.get(hdrs.LAST_MODIFIED)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                error = err
+            else:
+                if status == 401 and not reauthenticated:
+                    reauthenticated = True
+                    await self._async_refresh_access_token(access_token)
+                    continue
+                if status in (401, 403):
+                    raise PelotonAuthError(f"Peloton rejected the session ({status})")
+                if status == 304 and headers:
+                    request.not_modified = True
+                    return body
+                if status < 400:
+                    request.payload_bytes = len(body)
+                    return body
+                if status < 500:
+                    raise PelotonError(f"Peloton returned {status} for {path}")
+                error = PelotonConnectionError(f"Peloton returned {status}")
+
+            budget = _RETRY_BUDGET.get(None)
+            if request.retries >= REQUEST_RETRIES or (
+                budget is not None and budget[0] <= 0
+            ):
+                raise PelotonConnectionError("Could not connect to Peloton.") from error
+            request.retries += 1
+            if budget is not None:
+                budget[0] -= 1
+            _LOGGER.debug("Retrying %s after error: %s", path, error)
+            await asyncio.sleep(REQUEST_RETRY_DELAY * request.retries)
+
+    @staticmethod
+    def _decode(path: str, body: bytes) -> Any:
+        """Decode a response body.
+
+        The body is read once and handed to orjson instead of going through
+        aiohttp's text decoding and the stdlib json module.
+        """
+        try:
+            return json_loads(body)
+        except ValueError as err:
+            raise PelotonError(f"Invalid response from Peloton for {path}") from err
+
+    async def async_get_me(self) -> dict:
+        """Return the user's profile."""
+        me: dict = await self.async_get("/api/me", conditional=True)
+        self.username = me.get("username", self.username)
+        self.user_id = me.get("id")
+        return me
+
+    async def _async_get_user_id(self) -> str | None:
+        """Return the user id, fetching the profile if it is not known yet."""
+        if self.user_id is None:
+            await self.async_get_me()
+        return self.user_id
+
+    async def async_get_settings(self) -> dict:
+        """Return the user's settings."""
+        user_id = await self._async_get_user_id()
+        settings: dict = await self.async_get(
+            f"/api/user/{user_id}/settings", conditional=True
+        )
+        return settings
+
+    async def async_get_workouts(
+        self, limit: int = 1, page: int = 0, conditional: bool = False
+    ) -> dict:
+        """Return a page of the user's workouts, newest first.
+
+        Only the page polled over and over should be conditional, so that
+        history paging neither replaces its validator nor keeps big pages
+        cached.
+        """
+        user_id = await self._async_get_user_id()
+        workouts: dict = await self.async_get(
+            f"/api/user/{user_id}/workouts",
+            {"sort_by": "-created", "page": page, "limit": limit},
+            conditional=conditional,
+        )
+        return workouts
+
+    async def async_get_workout(self, workout_id: str) -> dict:
+        """Return a workout's details."""
+        workout: dict = await self.async_get(f"/api/workout/{workout_id}")
+        return workout
+
+    async def async_get_performance_graph(self, workout_id: str, every_n: int) -> dict:
+        """Return a workout's metrics, sampled every every_n seconds."""
+        performance_graph: dict = await self.async_get(
+            f"/api/workout/{workout_id}/performance_graph", {"every_n": every_n}
+        )
+        return performance_graph
+
+    async def async_get_instructor_name(self, instructor_id: str) -> str | None:
+        """Return an instructor's name. Names are cached for the session."""
+        if instructor_id not in self._instructor_names:
+            instructor: dict = await self.async_get(f"/api/instructor/{instructor_id}")
+            self._instructor_names[instructor_id] = instructor.get("name")
+        return self._instructor_names[instructor_id]
+
+    async def async_get_latest_workout(self) -> dict:
+        """Return the latest workout with its instructor's name.
+
+        Raises IndexError if the user has no workouts.
+        """
+
+        workouts = await self.async_get_workouts(limit=1, conditional=True)
+        workout = await self.async_get_workout(workouts.get("data", [])[0]["id"])
+        ride: dict = workout.get("ride") or {}
+
+        if instructor_id := ride.get("instructor_id"):
+            workout["instructor_name"] = await self.async_get_instructor_name(
+                instructor_id
+            )
+        else:
+            workout["instructor_name"] = (ride.get("instructor") or {}).get("name")
+
+        return workout
@@ -13,7 +13,8 @@ from homeassistant.helpers.entity_platform import DiscoveryInfoType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import DOMAIN
+from .const import DATA_INSTRUMENTATION, DOMAIN
+from .entity import PelotonStateWriteMixin
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,13 +29,14 @@ async def async_setup_entry(
     coordinator: DataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
     # Create a single instance of PelotonLastWorkout.
-    async_add_entities(
-        ([PelotonLastWorkout(coordinator)]),
-        True,
+    entities = [PelotonLastWorkout(coordinator)]
+    hass.data[DOMAIN][DATA_INSTRUMENTATION][entry.entry_id].add_state_writers(
+        entities
     )
+    async_add_entities(entities, True)
 
 
-class PelotonLastWorkout(BinarySensorEntity, CoordinatorEntity):  # type: ignore
+class PelotonLastWorkout(PelotonStateWriteMixin, BinarySensorEntity, CoordinatorEntity):  # type: ignore
     """Sensor showing exceptions over next few days."""
 
     _attr_is_on: bool | None
@@ -96,4 +98,11 @@ class PelotonLastWorkout(BinarySensorEntity, CoordinatorEntity):  # type: ignore
             }
         )
 
-        self.async_write_ha_state()
+        self.async_write_ha_state_if_changed(
+            (
+                self.available,
+                self.is_on,
+                self.icon,
+                tuple(self._attr_extra_state_attributes.items()),
+            )
+        )
@@ -0,0 +1,121 @@
+"""Circuit breaker for requests to the Peloton API."""
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+import random
+import time
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import BREAKER_BACKOFF_MAX, BREAKER_BACKOFF_MIN, BREAKER_FAILURE_THRESHOLD
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class PelotonCircuitBreaker:
+    """Stop calling Peloton while it is down.
+
+    After failure_threshold requests in a row fail to connect, the breaker
+    opens and requests fail straight away. Once the backoff has passed, one
+    probe request is let through (half-open): if it succeeds the breaker
+    closes, otherwise it opens again with the backoff doubled, up to
+    backoff_max. Backoffs are jittered so accounts do not probe in step.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        backoff_min: timedelta = BREAKER_BACKOFF_MIN,
+        backoff_max: timedelta = BREAKER_BACKOFF_MAX,
+    ) -> None:
+        """Initialize the breaker."""
+        self.failure_threshold = failure_threshold
+        self.backoff_min = backoff_min.total_seconds()
+        self.backoff_max = backoff_max.total_seconds()
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._backoff = 0.0
+        self._next_probe = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def next_probe_in(self) -> float:
+        """Return the seconds until the next probe while open, else 0."""
+        if self.state != STATE_OPEN:
+            return 0.0
+        return max(0.0, self._next_probe - time.monotonic())
+
+    def allow_request(self) -> bool:
+        """Return True if a request may go out now."""
+
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_OPEN and time.monotonic() >= self._next_probe:
+            _LOGGER.debug("Probing Peloton after backoff")
+            self.state = STATE_HALF_OPEN
+        if self.state == STATE_HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Record that Peloton answered, closing the breaker."""
+
+        if self.state != STATE_CLOSED:
+            _LOGGER.info("Peloton is reachable again")
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self._backoff = 0.0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed connection, opening the breaker if needed."""
+
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == STATE_HALF_OPEN or (
+            self.state == STATE_CLOSED
+            and self.consecutive_failures >= self.failure_threshold
+        ):
+            self._open()
+
+    def release(self) -> None:
+        """Give up a request without an outcome, e.g. when it was cancelled."""
+        self._probe_in_flight = False
+
+    def _open(self) -> None:
+        """Open the breaker with the next backoff."""
+
+        self._backoff = min(
+            self.backoff_max, max(self.backoff_min, self._backoff * 2)
+        )
+        # Equal jitter: wait at least half the backoff.
+        delay = self._backoff / 2 + random.uniform(0, self._backoff / 2)
+        self._next_probe = time.monotonic() + delay
+        if self.state == STATE_CLOSED:
+            self.times_opened += 1
+            _LOGGER.warning(
+                "Peloton is unreachable, pausing requests for %.0f seconds", delay
+            )
+        self.state = STATE_OPEN
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the breaker's state, for diagnostics."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "backoff_seconds": round(self._backoff, 1),
+            "next_probe": (
+                dt_util.utcnow() + timedelta(seconds=self.next_probe_in)
+            ).isoformat()
+            if self.state == STATE_OPEN
+            else None,
+        }
@@ -0,0 +1,201 @@
+"""Caches sitting between the coordinator and the Peloton API."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import timedelta
+import logging
+import time
+from typing import Any
+
+from .const import ENDPOINT_CACHE_TTL, WORKOUT_MEMO_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PelotonEndpointCache:
+    """Time-based cache for slow-changing endpoints such as profile and settings.
+
+    Each endpoint has its own lifetime. Everything is dropped early when a new
+    workout id shows up so workout counts refresh right after a ride.
+    """
+
+    def __init__(self, ttls: dict[str, timedelta] | None = None) -> None:
+        """Initialize the cache."""
+        self.ttls: dict[str, timedelta] = {**ENDPOINT_CACHE_TTL, **(ttls or {})}
+        self._entries: dict[str, tuple[float, Any]] = {}
+        self._workout_id: str | None = None
+        self.hits: int = 0
+        self.misses: int = 0
+
+    async def async_get(
+        self, endpoint: str, fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return the cached response for endpoint, fetching it if expired."""
+
+        if (entry := self._entries.get(endpoint)) and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        value = await fetch()
+        if (ttl := self.ttls.get(endpoint)) is not None:
+            self._entries[endpoint] = (time.monotonic() + ttl.total_seconds(), value)
+        return value
+
+    def invalidate(self, *endpoints: str) -> None:
+        """Drop the given endpoints, or every endpoint if none are given."""
+
+        if not endpoints:
+            self._entries.clear()
+            return
+        for endpoint in endpoints:
+            self._entries.pop(endpoint, None)
+
+    def check_workout_id(self, workout_id: str | None) -> bool:
+        """Invalidate the cache if the latest workout id changed.
+
+        Returns True if cached responses were dropped.
+        """
+
+        changed = self._workout_id is not None and workout_id != self._workout_id
+        self._workout_id = workout_id
+        if changed:
+            _LOGGER.debug("New workout %s found, invalidating cached endpoints", workout_id)
+            self.invalidate()
+        return changed
+
+
+def payload_fingerprint(
+    workout_stats_summary: dict,
+    workout_stats_detail: dict,
+    user_profile: dict,
+    user_settings: dict,
+) -> tuple | None:
+    """Return a cheap fingerprint of a poll's payloads, or None while live.
+
+    The summary is fetched again on every poll and compared in full, since
+    fields like the leaderboard rank keep changing after a workout ends. Its
+    id comes first so a new workout fails the comparison straight away. The
+    metrics, the profile and the settings come out of the caches above as
+    the same objects until they are fetched again, so comparing them rarely
+    looks past their identity.
+    """
+
+    if workout_stats_summary.get("status") != "COMPLETE":
+        return None
+    return (
+        workout_stats_summary.get("id"),
+        workout_stats_summary,
+        workout_stats_detail,
+        user_profile,
+        user_settings,
+    )
+
+
+@dataclass
+class _WorkoutMemoEntry:
+    """Memoized metrics, compiled stats and analytics for one completed workout."""
+
+    workout_stats_detail: dict
+    workout_stats_summary: dict | None = None
+    user_profile: dict | None = None
+    user_settings: dict | None = None
+    quant_data: list | None = None
+    analytics: Any = None
+
+
+class PelotonWorkoutMemo:
+    """Bounded LRU memo of completed workouts keyed by workout id and status.
+
+    A completed workout's metrics never change, so they are only downloaded
+    once. Its compiled stats are reused as long as the summary, profile and
+    settings they were built from are unchanged.
+    """
+
+    def __init__(self, maxsize: int = WORKOUT_MEMO_SIZE) -> None:
+        """Initialize the memo."""
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[str, str], _WorkoutMemoEntry] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def _get(self, workout_stats_summary: dict) -> _WorkoutMemoEntry | None:
+        """Return the entry for a completed workout, marking it recently used."""
+
+        if workout_stats_summary.get("status") != "COMPLETE":
+            return None
+        key = (workout_stats_summary["id"], "COMPLETE")
+        if (entry := self._entries.get(key)) is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def get_metrics(self, workout_stats_summary: dict) -> dict | None:
+        """Return memoized metrics for a completed workout."""
+
+        if (entry := self._get(workout_stats_summary)) is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.workout_stats_detail
+
+    def store_metrics(self, workout_stats_summary: dict, workout_stats_detail: dict) -> None:
+        """Memoize metrics if the workout is complete."""
+
+        if workout_stats_summary.get("status") != "COMPLETE":
+            return
+        key = (workout_stats_summary["id"], "COMPLETE")
+        self._entries[key] = _WorkoutMemoEntry(workout_stats_detail)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get_quant_data(
+        self, workout_stats_summary: dict, user_profile: dict, user_settings: dict
+    ) -> list | None:
+        """Return memoized stats if they were built from the same inputs."""
+
+        if (
+            (entry := self._get(workout_stats_summary)) is None
+            or entry.quant_data is None
+            or entry.user_profile is not user_profile
+            or entry.user_settings is not user_settings
+            or entry.workout_stats_summary != workout_stats_summary
+        ):
+            return None
+        return entry.quant_data
+
+    def store_quant_data(
+        self,
+        workout_stats_summary: dict,
+        user_profile: dict,
+        user_settings: dict,
+        quant_data: list,
+    ) -> None:
+        """Memoize compiled stats alongside the workout's metrics."""
+
+        if (entry := self._get(workout_stats_summary)) is None:
+            return
+        entry.workout_stats_summary = workout_stats_summary
+        entry.user_profile = user_profile
+        entry.user_settings = user_settings
+        entry.quant_data = quant_data
+
+    def invalidate_quant_data(self) -> None:
+        """Drop every memoized stat list, keeping metrics and analytics."""
+        for entry in self._entries.values():
+            entry.quant_data = None
+
+    def get_analytics(self, workout_stats_summary: dict) -> Any:
+        """Return memoized analytics for a completed workout."""
+
+        if (entry := self._get(workout_stats_summary)) is None:
+            return None
+        return entry.analytics
+
+    def store_analytics(self, workout_stats_summary: dict, analytics: Any) -> None:
+        """Memoize analytics alongside the workout's metrics."""
+
+        if (entry := self._get(workout_stats_summary)) is not None:
+            entry.analytics = analytics
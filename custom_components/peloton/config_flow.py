@@ -7,16 +7,20 @@ from typing import Any
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD
 from homeassistant.const import CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
-from pylotoncycle import PylotonCycle
-from pylotoncycle.pylotoncycle import PelotonLoginException
-from requests.exceptions import Timeout
 import voluptuous as vol
 
+from .api import PelotonApiClient, PelotonAuthError, PelotonError
+from .const import BATCH_MAX_CONCURRENT
+from .const import BATCH_MAX_CONCURRENT_LIMIT
+from .const import CONF_BATCH_MAX_CONCURRENT
+from .const import CONF_BATCH_POLLING
+from .const import CONF_DIAGNOSTIC_SENSORS
 from .const import DOMAIN
 from .const import INTEGRATION_NAME
+from .session import async_login
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,7 +31,7 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
 
 async def async_validate_input(
     hass: HomeAssistant, data: dict[str, Any]
-) -> PylotonCycle:
+) -> PelotonApiClient:
     """Validate the user input allows us to connect.
 
     Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
@@ -35,14 +39,15 @@ async def async_validate_input(
 
     _LOGGER.debug("Logging in and setting up session to the Peloton API")
     try:
-        api = await hass.async_add_executor_job(
-            PylotonCycle, data[CONF_USERNAME], data[CONF_PASSWORD]
+        # Logging in already fetches the user's profile, and the session is
+        # stored so setting up the entry does not need to log in again.
+        api = await async_login(
+            hass, data[CONF_USERNAME], data[CONF_PASSWORD], reuse_session=False
         )
-        await hass.async_add_executor_job(api.GetMe)
-    except PelotonLoginException as err:
+    except PelotonAuthError as err:
         _LOGGER.error("Username or password incorrect")
         raise InvalidAuth from err
-    except (ConnectionError, Timeout) as err:
+    except PelotonError as err:
         raise CannotConnect("Could not connect to Peloton.") from err
 
     return api
@@ -53,6 +58,14 @@ class PelotonConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type: igno
 
     VERSION = 2
 
+    @staticmethod
+    @callback  # type: ignore
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> PelotonOptionsFlow:
+        """Get the options flow for this handler."""
+        return PelotonOptionsFlow(config_entry)
+
     async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
         """Handle re-authentication with Peloton."""
 
@@ -133,6 +146,49 @@ class PelotonConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type: igno
         )
 
 
+class PelotonOptionsFlow(config_entries.OptionsFlow):  # type: ignore
+    """Handle Peloton options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_BATCH_POLLING,
+                        default=self._entry.options.get(CONF_BATCH_POLLING, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_BATCH_MAX_CONCURRENT,
+                        default=self._entry.options.get(
+                            CONF_BATCH_MAX_CONCURRENT, BATCH_MAX_CONCURRENT
+                        ),
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=1, max=BATCH_MAX_CONCURRENT_LIMIT),
+                    ),
+                    vol.Optional(
+                        CONF_DIAGNOSTIC_SENSORS,
+                        default=self._entry.options.get(
+                            CONF_DIAGNOSTIC_SENSORS, False
+                        ),
+                    ): bool,
+                }
+            ),
+        )
+
+
 class CannotConnect(HomeAssistantError):  # type: ignore
     """Error to indicate we cannot connect."""
 
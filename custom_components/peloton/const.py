@@ -1,9 +1,131 @@
 """Peloton integration constants."""
 
+from datetime import timedelta
+
 DOMAIN = "peloton"
 ISSUE_URL = "https://github.com/edwork/homeassistant-peloton-sensor/issues"
 INTEGRATION_NAME = "Peloton"
 
+API_BASE_URL = "https://api.onepeloton.com"
+AUTH_TOKEN_URL = "https://auth.onepeloton.com/oauth/token"
+AUTH_CLIENT_ID = "mgsmWCD0A8Qn6uz6mmqI6qeBNHH9IPwS"
+AUTH_REDIRECT_URI = "https://members.onepeloton.com/callback"
+
+# Seconds before a request to Peloton is abandoned.
+REQUEST_TIMEOUT = 10
+# Retries for connection errors, timeouts and server errors, and the delay in
+# seconds before the first retry (grows linearly with each attempt).
+REQUEST_RETRIES = 2
+REQUEST_RETRY_DELAY = 0.5
+# Retries allowed across all requests of one poll.
+REQUEST_RETRY_BUDGET = 3
+
+# After this many requests in a row fail to connect, requests are paused
+# for a backoff that doubles on each failed probe, from min to max.
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_BACKOFF_MIN = timedelta(seconds=30)
+BREAKER_BACKOFF_MAX = timedelta(minutes=30)
+
+STORAGE_KEY = f"{DOMAIN}.sessions"
+STORAGE_VERSION = 1
+
+# Keys for integration-wide objects shared by all config entries.
+DATA_BATCH_SCHEDULER = "batch_scheduler"
+DATA_CLIENT_SESSION = "client_session"
+DATA_HISTORY_STORE = "history_store"
+DATA_INSTRUMENTATION = "instrumentation"
+DATA_SESSION_STORE = "session_store"
+
+# Poll every 10 seconds while a workout is in progress.
+UPDATE_INTERVAL_ACTIVE = timedelta(seconds=10)
+
+# When the latest workout is finished, back off one step per idle poll.
+UPDATE_INTERVAL_IDLE_STEPS = (
+    timedelta(seconds=30),
+    timedelta(minutes=1),
+    timedelta(minutes=2),
+    timedelta(minutes=5),
+)
+
+# The Peloton user id is kept in the entry data, so the account's workout
+# history can be deleted when the entry is removed without logging in.
+CONF_USER_ID = "user_id"
+
+# Options
+CONF_BATCH_POLLING = "batch_polling"
+CONF_BATCH_MAX_CONCURRENT = "batch_max_concurrent"
+CONF_DIAGNOSTIC_SENSORS = "diagnostic_sensors"
+
+# Events fired on the bus when the latest workout starts, pauses, resumes or
+# ends, and when a completed workout set a new personal record.
+EVENT_WORKOUT_STARTED = f"{DOMAIN}_workout_started"
+EVENT_WORKOUT_PAUSED = f"{DOMAIN}_workout_paused"
+EVENT_WORKOUT_RESUMED = f"{DOMAIN}_workout_resumed"
+EVENT_WORKOUT_ENDED = f"{DOMAIN}_workout_ended"
+EVENT_PERSONAL_RECORD = f"{DOMAIN}_personal_record"
+
+# Accounts using batched polling share one timer. At most this many of them
+# refresh at the same time, each starting at a random offset within the spread.
+# Each account can lower or raise the cap in its options, up to the maximum;
+# the lowest cap of the batched accounts applies.
+BATCH_MAX_CONCURRENT = 2
+BATCH_MAX_CONCURRENT_LIMIT = 10
+BATCH_SPREAD = timedelta(seconds=5)
+
+# How long slow-changing endpoint responses are reused before re-fetching.
+ENDPOINT_CACHE_TTL = {
+    "me": timedelta(minutes=30),
+    "settings": timedelta(hours=1),
+}
+
+# Seconds per sample requested from the performance graph endpoint. While a
+# workout is in progress only the latest sample is used, so the series is kept
+# coarse. A completed workout's series is fetched once for its analytics,
+# whose shortest window is 5 seconds, so per-second samples are not needed.
+METRICS_EVERY_N_LIVE = 60
+METRICS_EVERY_N_FULL = 5
+
+# Local workout history, kept in a SQLite database under .storage. Workouts
+# from the last HISTORY_DETAIL_WINDOW also store calories and distance, read
+# from a performance graph sampled every HISTORY_EVERY_N seconds.
+HISTORY_DATABASE = f"{DOMAIN}_history.db"
+HISTORY_PAGE_SIZE = 100
+# Once the history is backfilled a sync only expects the few workouts since
+# the last one, so it starts with a small page.
+HISTORY_INCREMENTAL_PAGE_SIZE = 5
+HISTORY_DETAIL_WINDOW = timedelta(days=365)
+HISTORY_EVERY_N = 1000
+# History requests are spaced out so a first sync of a long history does not
+# hit Peloton with hundreds of requests at once, and may only retry a few
+# times in total before the sync stops until the next completed workout.
+HISTORY_REQUEST_DELAY = timedelta(seconds=1)
+HISTORY_RETRY_BUDGET = 2
+
+# Trailing windows for the rolling output, calories and distance totals.
+AGGREGATE_WINDOWS = (timedelta(days=7), timedelta(days=30), timedelta(days=365))
+
+# Power is smoothed over 30 seconds before computing normalized power.
+ANALYTICS_ROLLING_POWER = timedelta(seconds=30)
+# Durations for the best average power of a completed workout.
+ANALYTICS_POWER_CURVE = (
+    timedelta(seconds=5),
+    timedelta(minutes=1),
+    timedelta(minutes=5),
+    timedelta(minutes=20),
+)
+# Lower bounds of heart rate zones 2 to 5 as a fraction of max heart rate.
+ANALYTICS_HEART_RATE_ZONES = (0.65, 0.75, 0.85, 0.95)
+
+# Upper bounds in seconds of the request latency histogram buckets.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Number of completed workouts whose metrics are kept in memory. Only the
+# latest workout is ever read again, so an older one is dropped as soon as a
+# new workout completes.
+WORKOUT_MEMO_SIZE = 1
+# Number of converted workout timestamps kept, shared by every account.
+WORKOUT_DATETIMES_CACHE_SIZE = 8
+
 STARTUP_MESSAGE = f"""
 ===================================================================
                                .****.
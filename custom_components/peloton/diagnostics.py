@@ -0,0 +1,41 @@
+"""Diagnostics support for Peloton."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import CONF_USER_ID, DATA_INSTRUMENTATION, DOMAIN
+from .instrumentation import PelotonInstrumentation
+
+TO_REDACT = {CONF_PASSWORD, CONF_USER_ID, CONF_USERNAME}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+
+    coordinator: DataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    instrumentation: PelotonInstrumentation = hass.data[DOMAIN][
+        DATA_INSTRUMENTATION
+    ][entry.entry_id]
+    data: dict = coordinator.data or {}
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": str(coordinator.update_interval),
+            "last_fetch_timings": data.get("fetch_timings"),
+            "workout_status": data.get("workout_stats_summary", {}).get("status"),
+        },
+        "instrumentation": instrumentation.as_dict(),
+    }
@@ -0,0 +1,30 @@
+"""Shared helpers for Peloton entities."""
+from __future__ import annotations
+
+from homeassistant.core import callback
+
+
+class PelotonStateWriteMixin:
+    """Only write entity state when something actually changed.
+
+    Entities build a snapshot of everything that ends up in their state
+    (availability, value, unit, icon, attributes) on each coordinator update
+    and pass it to async_write_ha_state_if_changed.
+    """
+
+    _last_written_snapshot: tuple | None = None
+    # Summed over all entities in the diagnostics download.
+    state_writes: int = 0
+    skipped_state_writes: int = 0
+
+    @callback  # type: ignore
+    def async_write_ha_state_if_changed(self, snapshot: tuple) -> None:
+        """Write state unless it matches the last written snapshot."""
+
+        if snapshot == self._last_written_snapshot:
+            self.skipped_state_writes += 1
+            return
+
+        self._last_written_snapshot = snapshot
+        self.state_writes += 1
+        self.async_write_ha_state()  # type: ignore[attr-defined]
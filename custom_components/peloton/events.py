@@ -0,0 +1,107 @@
+"""Fire workout lifecycle events from coordinator updates."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import (
+    EVENT_PERSONAL_RECORD,
+    EVENT_WORKOUT_ENDED,
+    EVENT_WORKOUT_PAUSED,
+    EVENT_WORKOUT_RESUMED,
+    EVENT_WORKOUT_STARTED,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def workout_snapshot(workout: dict) -> tuple[str | None, str | None, bool]:
+    """Return the parts of a workout summary that events are fired for."""
+    return workout.get("id"), workout.get("status"), bool(workout.get("is_paused"))
+
+
+def workout_transitions(
+    previous: tuple[str | None, str | None, bool], workout: dict
+) -> list[str]:
+    """Return the events for the change from previous to workout."""
+
+    previous_id, previous_status, previous_paused = previous
+    workout_id, status, paused = workout_snapshot(workout)
+    new_workout = workout_id != previous_id
+
+    if status == "IN_PROGRESS":
+        if new_workout or previous_status != "IN_PROGRESS":
+            return [EVENT_WORKOUT_STARTED]
+        if paused != previous_paused:
+            return [EVENT_WORKOUT_PAUSED if paused else EVENT_WORKOUT_RESUMED]
+    elif status == "COMPLETE" and (new_workout or previous_status != "COMPLETE"):
+        # A short workout may start and end between two polls.
+        if workout.get("is_total_work_personal_record"):
+            return [EVENT_WORKOUT_ENDED, EVENT_PERSONAL_RECORD]
+        return [EVENT_WORKOUT_ENDED]
+    return []
+
+
+class PelotonWorkoutEvents:
+    """Fire peloton_* events when the latest workout changes.
+
+    Each coordinator update is compared with the previous one, so an
+    automation triggers once per transition instead of re-evaluating
+    templates on every state write. Nothing is fired for the first update,
+    which only records where the workout stands.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        coordinator: DataUpdateCoordinator,
+    ) -> None:
+        """Initialize the events."""
+        self.hass = hass
+        self.entry = entry
+        self.coordinator = coordinator
+        self._snapshot: tuple[str | None, str | None, bool] | None = None
+
+    @callback  # type: ignore
+    def async_start(self) -> None:
+        """Start comparing coordinator updates."""
+        self._async_handle_coordinator_update()
+        self.entry.async_on_unload(
+            self.coordinator.async_add_listener(self._async_handle_coordinator_update)
+        )
+
+    @callback  # type: ignore
+    def _async_handle_coordinator_update(self) -> None:
+        """Fire an event for each transition since the last update."""
+
+        if not (data := self.coordinator.data):
+            return
+        workout: dict = data.get("workout_stats_summary", {})
+        snapshot = workout_snapshot(workout)
+        if snapshot == self._snapshot:
+            return
+
+        if self._snapshot is not None:
+            for event_type in workout_transitions(self._snapshot, workout):
+                _LOGGER.debug("Firing %s for workout %s", event_type, snapshot[0])
+                self.hass.bus.async_fire(event_type, self._event_data(workout))
+        self._snapshot = snapshot
+
+    def _event_data(self, workout: dict) -> dict[str, Any]:
+        """Return what automations need to know about the workout."""
+
+        ride: dict = workout.get("ride") or {}
+        return {
+            "entry_id": self.entry.entry_id,
+            "user_id": workout.get("user_id"),
+            "workout_id": workout.get("id"),
+            "fitness_discipline": workout.get("fitness_discipline"),
+            "title": ride.get("title"),
+            "instructor": workout.get("instructor_name"),
+            "total_work": workout.get("total_work"),
+        }
@@ -0,0 +1,355 @@
+"""Incremental sync of each account's workout history into a local database."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import astuple, dataclass
+import logging
+import os
+import sqlite3
+import time
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .api import PelotonApiClient, PelotonError
+from .const import (
+    DATA_HISTORY_STORE,
+    DOMAIN,
+    HISTORY_DATABASE,
+    HISTORY_DETAIL_WINDOW,
+    HISTORY_EVERY_N,
+    HISTORY_INCREMENTAL_PAGE_SIZE,
+    HISTORY_PAGE_SIZE,
+    HISTORY_REQUEST_DELAY,
+    HISTORY_RETRY_BUDGET,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workouts (
+    workout_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    start_time INTEGER,
+    end_time INTEGER,
+    fitness_discipline TEXT,
+    device_type TEXT,
+    total_work REAL,
+    calories INTEGER,
+    distance REAL,
+    distance_unit TEXT
+);
+CREATE INDEX IF NOT EXISTS workouts_user_created ON workouts (user_id, created_at);
+CREATE TABLE IF NOT EXISTS sync_state (
+    user_id TEXT PRIMARY KEY,
+    backfilled INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+@dataclass
+class PelotonHistoryWorkout:
+    """A completed workout as kept in the local history."""
+
+    workout_id: str
+    user_id: str
+    created_at: int
+    start_time: int | None
+    end_time: int | None
+    fitness_discipline: str | None
+    device_type: str | None
+    total_work: float | None
+    calories: int | None = None
+    distance: float | None = None
+    distance_unit: str | None = None
+
+
+def history_workout_from_api(
+    workout: dict, user_id: str, performance_graph: dict | None = None
+) -> PelotonHistoryWorkout:
+    """Build a history row from a workout and, if given, its performance graph."""
+
+    history_workout = PelotonHistoryWorkout(
+        workout["id"],
+        user_id,
+        workout["created_at"],
+        workout.get("start_time"),
+        workout.get("end_time"),
+        workout.get("fitness_discipline"),
+        workout.get("device_type"),
+        workout.get("total_work"),
+    )
+    summary: dict
+    for summary in (performance_graph or {}).get("summaries", []):
+        if summary.get("slug") in ("total_calories", "calories"):
+            history_workout.calories = summary.get("value")
+        elif summary.get("slug") == "distance":
+            history_workout.distance = summary.get("value")
+            history_workout.distance_unit = summary.get("display_unit")
+    return history_workout
+
+
+class PelotonHistoryStore:
+    """SQLite database of completed workouts, keyed by workout id.
+
+    All accounts share one database file under .storage. Queries run in the
+    executor and open their own connection, so no connection is shared
+    between threads.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the store."""
+        self.path = path
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one transaction, creating tables on first use."""
+        if not self._initialized:
+            # .storage only exists once Home Assistant has saved something.
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        try:
+            if not self._initialized:
+                connection.executescript(_SCHEMA)
+                self._initialized = True
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def add_workouts(self, workouts: Iterable[PelotonHistoryWorkout]) -> None:
+        """Insert or replace workouts."""
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO workouts "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [astuple(workout) for workout in workouts],
+            )
+
+    def high_water_mark(self, user_id: str) -> int:
+        """Return the creation time of the newest stored workout."""
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT MAX(created_at) FROM workouts WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return int(row[0] or 0)
+
+    def workout_ids(self, user_id: str) -> set[str]:
+        """Return the ids of the account's stored workouts."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT workout_id FROM workouts WHERE user_id = ?", (user_id,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def is_backfilled(self, user_id: str) -> bool:
+        """Return True once the account's full history has been synced."""
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT backfilled FROM sync_state WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def set_backfilled(self, user_id: str) -> None:
+        """Record that the account's full history has been synced."""
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, 1)", (user_id,)
+            )
+
+    def delete_workouts(self, user_id: str) -> None:
+        """Delete the account's workouts and sync state."""
+        with self._connect() as connection:
+            connection.execute("DELETE FROM workouts WHERE user_id = ?", (user_id,))
+            connection.execute("DELETE FROM sync_state WHERE user_id = ?", (user_id,))
+
+    def get_workouts(self, user_id: str, since: int = 0) -> list[PelotonHistoryWorkout]:
+        """Return the account's workouts created at or after since, oldest first."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT * FROM workouts WHERE user_id = ? AND created_at >= ? "
+                "ORDER BY created_at",
+                (user_id, since),
+            ).fetchall()
+        return [PelotonHistoryWorkout(*row) for row in rows]
+
+
+@callback  # type: ignore
+def async_get_history_store(hass: HomeAssistant) -> PelotonHistoryStore:
+    """Return the integration's history store, creating it on first use."""
+
+    domain_data: dict = hass.data.setdefault(DOMAIN, {})
+    if (history_store := domain_data.get(DATA_HISTORY_STORE)) is None:
+        history_store = domain_data[DATA_HISTORY_STORE] = PelotonHistoryStore(
+            hass.config.path(".storage", HISTORY_DATABASE)
+        )
+    return history_store
+
+
+class PelotonHistorySync:
+    """Keep an account's local workout history up to date.
+
+    The first sync pages back through the whole history. After that only
+    workouts newer than the newest stored one are fetched, whenever the
+    coordinator sees a workout complete. Workouts from the last
+    HISTORY_DETAIL_WINDOW also get their calories and distance from a
+    coarse performance graph.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        coordinator: DataUpdateCoordinator,
+        api: PelotonApiClient,
+        history_store: PelotonHistoryStore,
+    ) -> None:
+        """Initialize the history sync."""
+        self.hass = hass
+        self.entry = entry
+        self.coordinator = coordinator
+        self.api = api
+        self.history_store = history_store
+        self._lock = asyncio.Lock()
+        self._synced_workout: str | None = None
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    @callback  # type: ignore
+    def async_start(self) -> None:
+        """Sync now and again whenever a workout completes."""
+        self.entry.async_on_unload(
+            self.coordinator.async_add_listener(self._async_handle_coordinator_update)
+        )
+        self._async_schedule_sync()
+
+    @callback  # type: ignore
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Call update_callback after each sync that stored new workouts."""
+        self._listeners.append(update_callback)
+        return lambda: self._listeners.remove(update_callback)
+
+    @callback  # type: ignore
+    def _async_handle_coordinator_update(self) -> None:
+        """Sync when the latest workout has just completed."""
+
+        workout: dict = (self.coordinator.data or {}).get("workout_stats_summary", {})
+        workout_id = workout.get("id")
+        if workout.get("status") == "COMPLETE" and workout_id != self._synced_workout:
+            self._synced_workout = workout_id
+            self._async_schedule_sync()
+
+    @callback  # type: ignore
+    def _async_schedule_sync(self) -> None:
+        """Run a sync in the background unless one is already running."""
+        if not self._lock.locked():
+            self.entry.async_create_background_task(
+                self.hass, self.async_sync(), f"{self.entry.title} history sync"
+            )
+
+    async def async_sync(self) -> int:
+        """Fetch workouts missing from the local history and return how many."""
+
+        async with self._lock:
+            try:
+                added = await self._async_sync()
+            except PelotonError as err:
+                _LOGGER.debug("Workout history sync stopped: %s", err)
+                return 0
+            except sqlite3.Error as err:
+                _LOGGER.warning("Could not update the workout history: %s", err)
+                return 0
+
+        if added:
+            for update_callback in list(self._listeners):
+                update_callback()
+        return added
+
+    async def _async_sync(self) -> int:
+        """Page through workouts newer than the high-water mark.
+
+        Stops at the first request that fails, even after retries. Until the
+        first full sync finishes, every page is read again on the next sync,
+        but workouts stored by an earlier attempt are skipped, so their
+        performance graphs are not fetched twice.
+        """
+
+        self.api.reset_retry_budget(HISTORY_RETRY_BUDGET)
+        user_id = self.api.user_id or (await self.api.async_get_me())["id"]
+        store = self.history_store
+        backfilled, high_water_mark = await asyncio.gather(
+            self.hass.async_add_executor_job(store.is_backfilled, user_id),
+            self.hass.async_add_executor_job(store.high_water_mark, user_id),
+        )
+        if backfilled:
+            stored_ids: set[str] = set()
+            page_size = HISTORY_INCREMENTAL_PAGE_SIZE
+        else:
+            stored_ids = await self.hass.async_add_executor_job(
+                store.workout_ids, user_id
+            )
+            high_water_mark = 0
+            page_size = HISTORY_PAGE_SIZE
+
+        detail_since = time.time() - HISTORY_DETAIL_WINDOW.total_seconds()
+        added = 0
+        page = 0
+        while True:
+            response = await self.api.async_get_workouts(page_size, page)
+            workouts: list[dict] = response.get("data", [])
+            new = [w for w in workouts if (w.get("created_at") or 0) > high_water_mark]
+
+            rows: list[PelotonHistoryWorkout] = []
+            try:
+                for workout in new:
+                    if (
+                        workout.get("status") == "COMPLETE"
+                        and workout["id"] not in stored_ids
+                    ):
+                        rows.append(
+                            await self._async_history_workout(
+                                workout, user_id, detail_since
+                            )
+                        )
+            finally:
+                # Keep what was fetched before a failed request, so the next
+                # attempt does not fetch it again.
+                if rows:
+                    await self.hass.async_add_executor_job(store.add_workouts, rows)
+                    stored_ids.update(row.workout_id for row in rows)
+                    added += len(rows)
+
+            if len(new) < len(workouts) or page + 1 >= response.get("page_count", 0):
+                break
+            if page_size < HISTORY_PAGE_SIZE:
+                # More new workouts than the small page holds: start over with
+                # full pages, skipping the ones just stored.
+                page_size = HISTORY_PAGE_SIZE
+                page = 0
+            else:
+                page += 1
+            await asyncio.sleep(HISTORY_REQUEST_DELAY.total_seconds())
+
+        if not backfilled:
+            await self.hass.async_add_executor_job(store.set_backfilled, user_id)
+
+        _LOGGER.debug("Synced %s workouts into the local history", added)
+        return added
+
+    async def _async_history_workout(
+        self, workout: dict, user_id: str, detail_since: float
+    ) -> PelotonHistoryWorkout:
+        """Convert a workout list entry, adding calories and distance if recent."""
+
+        if workout["created_at"] < detail_since:
+            return history_workout_from_api(workout, user_id)
+
+        await asyncio.sleep(HISTORY_REQUEST_DELAY.total_seconds())
+        performance_graph = await self.api.async_get_performance_graph(
+            workout["id"], HISTORY_EVERY_N
+        )
+        return history_workout_from_api(workout, user_id, performance_graph)
@@ -0,0 +1,227 @@
+"""Request and poll instrumentation for diagnostics."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+from homeassistant.const import PERCENTAGE, UnitOfTime
+from homeassistant.helpers.entity import EntityCategory
+
+from .const import LATENCY_BUCKETS
+from .sensor import PelotonStat
+
+
+class _Cache(Protocol):
+    """A cache that counts hits and misses."""
+
+    hits: int
+    misses: int
+
+
+class _StateWriter(Protocol):
+    """An entity that counts written and skipped state writes."""
+
+    state_writes: int
+    skipped_state_writes: int
+
+
+@dataclass
+class _EndpointStats:
+    """Counters for one API endpoint."""
+
+    latency_buckets: list[int]
+    requests: int = 0
+    failures: int = 0
+    retries: int = 0
+    not_modified: int = 0
+    total_seconds: float = 0.0
+    payload_bytes: int = 0
+    last_payload_bytes: int = 0
+
+
+@dataclass
+class _PollStats:
+    """Counters for the coordinator's polls."""
+
+    polls: int = 0
+    last_seconds: float | None = None
+    compile_runs: int = 0
+    compile_cpu_seconds: float = 0.0
+    last_compile_cpu_seconds: float | None = None
+    endpoints: dict[str, _EndpointStats] = field(default_factory=dict)
+
+
+class PelotonInstrumentation:
+    """Collect latency histograms, payload sizes, retries and cache ratios.
+
+    Recording only bumps counters, so it is cheap enough to stay on for
+    every request. Latencies are counted into LATENCY_BUCKETS, with one
+    extra bucket for anything slower.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """Initialize the instrumentation."""
+        self.buckets = buckets
+        self._stats = _PollStats()
+        self._caches: dict[str, _Cache] = {}
+        self._state_writers: list[_StateWriter] = []
+        self._status: dict[str, Callable[[], dict[str, Any]]] = {}
+
+    def add_cache(self, name: str, cache: _Cache) -> None:
+        """Report a cache's hit ratio."""
+        self._caches[name] = cache
+
+    def add_state_writers(self, entities: Iterable[_StateWriter]) -> None:
+        """Report how many state writes the entities wrote and skipped."""
+        self._state_writers.extend(entities)
+
+    def add_status(self, name: str, get_status: Callable[[], dict[str, Any]]) -> None:
+        """Include another component's status in the diagnostics."""
+        self._status[name] = get_status
+
+    def record_request(
+        self,
+        endpoint: str,
+        seconds: float,
+        payload_bytes: int,
+        retries: int,
+        failed: bool,
+        not_modified: bool = False,
+    ) -> None:
+        """Record one API request, including its retries."""
+
+        if (stats := self._stats.endpoints.get(endpoint)) is None:
+            stats = self._stats.endpoints[endpoint] = _EndpointStats(
+                [0] * (len(self.buckets) + 1)
+            )
+        stats.latency_buckets[bisect_left(self.buckets, seconds)] += 1
+        stats.requests += 1
+        stats.failures += failed
+        stats.retries += retries
+        stats.not_modified += not_modified
+        stats.total_seconds += seconds
+        stats.payload_bytes += payload_bytes
+        stats.last_payload_bytes = payload_bytes
+
+    def record_poll(self, seconds: float) -> None:
+        """Record how long a coordinator update took."""
+        self._stats.polls += 1
+        self._stats.last_seconds = seconds
+
+    def record_compile(self, cpu_seconds: float) -> None:
+        """Record the CPU time spent compiling stats."""
+        self._stats.compile_runs += 1
+        self._stats.compile_cpu_seconds += cpu_seconds
+        self._stats.last_compile_cpu_seconds = cpu_seconds
+
+    def cache_hit_ratio(self) -> float | None:
+        """Return the share of cache lookups served from any cache."""
+
+        hits = sum(cache.hits for cache in self._caches.values())
+        lookups = hits + sum(cache.misses for cache in self._caches.values())
+        return hits / lookups if lookups else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return everything recorded so far, for diagnostics."""
+
+        stats = self._stats
+        bucket_labels = [f"<={bound}s" for bound in self.buckets] + [
+            f">{self.buckets[-1]}s"
+        ]
+        return {
+            "polls": stats.polls,
+            "last_poll_seconds": stats.last_seconds,
+            "compile": {
+                "runs": stats.compile_runs,
+                "cpu_seconds": round(stats.compile_cpu_seconds, 6),
+                "last_cpu_seconds": stats.last_compile_cpu_seconds,
+            },
+            "state_writes": {
+                "written": sum(
+                    entity.state_writes for entity in self._state_writers
+                ),
+                "skipped": sum(
+                    entity.skipped_state_writes for entity in self._state_writers
+                ),
+            },
+            "caches": {
+                name: {
+                    "hits": cache.hits,
+                    "misses": cache.misses,
+                    "hit_ratio": round(cache.hits / lookups, 3)
+                    if (lookups := cache.hits + cache.misses)
+                    else None,
+                }
+                for name, cache in self._caches.items()
+            },
+            "endpoints": {
+                endpoint: {
+                    "requests": endpoint_stats.requests,
+                    "failures": endpoint_stats.failures,
+                    "retries": endpoint_stats.retries,
+                    "not_modified": endpoint_stats.not_modified,
+                    "average_seconds": round(
+                        endpoint_stats.total_seconds / endpoint_stats.requests, 3
+                    ),
+                    "latency_histogram": dict(
+                        zip(bucket_labels, endpoint_stats.latency_buckets)
+                    ),
+                    "payload_bytes": endpoint_stats.payload_bytes,
+                    "last_payload_bytes": endpoint_stats.last_payload_bytes,
+                }
+                for endpoint, endpoint_stats in stats.endpoints.items()
+            },
+            **{name: get_status() for name, get_status in self._status.items()},
+        }
+
+    def get_stats(self) -> list[PelotonStat]:
+        """Return diagnostic stats for the optional diagnostic sensors."""
+
+        stats = self._stats
+        return [
+            PelotonStat(
+                "Poll Duration",
+                round(stats.last_seconds, 3)
+                if stats.last_seconds is not None
+                else None,
+                UnitOfTime.SECONDS,
+                SensorDeviceClass.DURATION,
+                SensorStateClass.MEASUREMENT,
+                "mdi:timer-sync-outline",
+                EntityCategory.DIAGNOSTIC,
+            ),
+            PelotonStat(
+                "Compile CPU Time",
+                round(stats.last_compile_cpu_seconds * 1000, 2)
+                if stats.last_compile_cpu_seconds is not None
+                else None,
+                UnitOfTime.MILLISECONDS,
+                SensorDeviceClass.DURATION,
+                SensorStateClass.MEASUREMENT,
+                "mdi:chip",
+                EntityCategory.DIAGNOSTIC,
+            ),
+            PelotonStat(
+                "API Retries",
+                sum(endpoint.retries for endpoint in stats.endpoints.values()),
+                None,
+                None,
+                SensorStateClass.TOTAL_INCREASING,
+                "mdi:reload-alert",
+                EntityCategory.DIAGNOSTIC,
+            ),
+            PelotonStat(
+                "Cache Hit Ratio",
+                round(ratio * 100, 1)
+                if (ratio := self.cache_hit_ratio()) is not None
+                else None,
+                PERCENTAGE,
+                None,
+                SensorStateClass.MEASUREMENT,
+                "mdi:cached",
+                EntityCategory.DIAGNOSTIC,
+            ),
+        ]
@@ -0,0 +1,196 @@
+"""Polling schedules for the Peloton coordinators."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import logging
+import random
+import time
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import (
+    BATCH_MAX_CONCURRENT,
+    BATCH_SPREAD,
+    DATA_BATCH_SCHEDULER,
+    DOMAIN,
+    UPDATE_INTERVAL_ACTIVE,
+    UPDATE_INTERVAL_IDLE_STEPS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PelotonPollScheduler:
+    """Pick the next update interval from the latest workout's state.
+
+    Polls at the active interval while a workout is in progress or a new
+    workout id shows up, and steps through the idle intervals otherwise.
+    """
+
+    def __init__(
+        self,
+        active_interval: timedelta = UPDATE_INTERVAL_ACTIVE,
+        idle_intervals: tuple[timedelta, ...] = UPDATE_INTERVAL_IDLE_STEPS,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.active_interval = active_interval
+        self.idle_intervals = idle_intervals
+        self._workout_id: str | None = None
+        self._idle_step: int = 0
+        self.interval: timedelta = active_interval
+
+    @property
+    def is_idle(self) -> bool:
+        """Return True if the scheduler has started backing off."""
+        return self._idle_step > 0
+
+    def next_interval(self, workout_id: str | None, status: str | None) -> timedelta:
+        """Return the interval to wait before the next poll."""
+
+        new_workout = self._workout_id is not None and workout_id != self._workout_id
+        self._workout_id = workout_id
+
+        if status == "IN_PROGRESS" or new_workout:
+            if self._idle_step:
+                _LOGGER.debug("Workout activity detected, polling at active interval")
+            self._idle_step = 0
+            self.interval = self.active_interval
+            return self.interval
+
+        self.interval = self.idle_intervals[
+            min(self._idle_step, len(self.idle_intervals) - 1)
+        ]
+        self._idle_step += 1
+        return self.interval
+
+
+@dataclass
+class _BatchAccount:
+    """An account polled by the batch scheduler."""
+
+    coordinator: DataUpdateCoordinator
+    poll_scheduler: PelotonPollScheduler
+    last_cycle: float
+    max_concurrent: int
+
+
+class PelotonBatchScheduler:
+    """Poll all opted-in accounts from one shared timer.
+
+    Every cycle refreshes the accounts whose own adaptive interval has
+    elapsed. Their refreshes start at random offsets within the spread and
+    at most max_concurrent run at once, so many accounts do not hit Peloton
+    at the same moment. Every account sets a cap in its options and the
+    lowest one is used.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        cycle_interval: timedelta = UPDATE_INTERVAL_ACTIVE,
+        spread: timedelta = BATCH_SPREAD,
+    ) -> None:
+        """Initialize the batch scheduler."""
+        self.hass = hass
+        self.cycle_interval = cycle_interval
+        self.spread = spread
+        self._accounts: dict[str, _BatchAccount] = {}
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._cycle_running = False
+
+    @callback  # type: ignore
+    def async_register(
+        self,
+        entry_id: str,
+        coordinator: DataUpdateCoordinator,
+        poll_scheduler: PelotonPollScheduler,
+        max_concurrent: int = BATCH_MAX_CONCURRENT,
+    ) -> None:
+        """Add an account to the batch."""
+
+        self._accounts[entry_id] = _BatchAccount(
+            coordinator, poll_scheduler, time.monotonic(), max_concurrent
+        )
+        if self._unsub_timer is None:
+            self._unsub_timer = async_track_time_interval(
+                self.hass, self._async_run_cycle, self.cycle_interval
+            )
+
+    @property
+    def max_concurrent(self) -> int:
+        """Return how many accounts may refresh at the same time."""
+        return min(
+            (account.max_concurrent for account in self._accounts.values()),
+            default=BATCH_MAX_CONCURRENT,
+        )
+
+    @callback  # type: ignore
+    def async_unregister(self, entry_id: str) -> None:
+        """Remove an account from the batch, stopping the timer if it was the last."""
+
+        self._accounts.pop(entry_id, None)
+        if not self._accounts and self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    async def _async_run_cycle(self, now: datetime) -> None:
+        """Refresh every account that is due."""
+
+        if self._cycle_running:
+            _LOGGER.debug("Previous Peloton poll cycle still running, skipping")
+            return
+
+        cycle_start = time.monotonic()
+        # Allow for timer drift so an account due every cycle is never skipped.
+        tolerance = self.cycle_interval.total_seconds() / 2
+        due = [
+            account
+            for account in self._accounts.values()
+            if cycle_start - account.last_cycle
+            >= account.poll_scheduler.interval.total_seconds() - tolerance
+        ]
+        if not due:
+            return
+
+        self._cycle_running = True
+        # Cycles never overlap, so each can have its own semaphore and pick
+        # up a cap changed in the options since the last one.
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        try:
+            await asyncio.gather(
+                *(
+                    self._async_refresh(account, cycle_start, semaphore)
+                    for account in due
+                )
+            )
+        finally:
+            self._cycle_running = False
+
+    async def _async_refresh(
+        self,
+        account: _BatchAccount,
+        cycle_start: float,
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        """Refresh one account after a random delay."""
+
+        account.last_cycle = cycle_start
+        await asyncio.sleep(random.uniform(0, self.spread.total_seconds()))
+        async with semaphore:
+            await account.coordinator.async_refresh()
+
+
+@callback  # type: ignore
+def async_get_batch_scheduler(hass: HomeAssistant) -> PelotonBatchScheduler:
+    """Return the integration-wide batch scheduler, creating it on first use."""
+
+    domain_data: dict = hass.data.setdefault(DOMAIN, {})
+    if (batch_scheduler := domain_data.get(DATA_BATCH_SCHEDULER)) is None:
+        batch_scheduler = domain_data[DATA_BATCH_SCHEDULER] = PelotonBatchScheduler(
+            hass
+        )
+    return batch_scheduler
@@ -1,7 +1,9 @@
 """Implementation of Home Assistant Sensor entity."""
 from __future__ import annotations
 
+from collections.abc import Iterable
 from dataclasses import dataclass
+from functools import lru_cache
 import logging
 from typing import Any, Optional
 
@@ -11,13 +13,15 @@ from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.sensor import SensorStateClass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.entity_platform import DiscoveryInfoType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import DOMAIN
+from .const import DATA_INSTRUMENTATION, DOMAIN
+from .entity import PelotonStateWriteMixin
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,7 +29,13 @@ latest_stats: dict = {}
 latest_workout: dict = {}
 
 
-@dataclass
+@lru_cache(maxsize=256)
+def stat_key(name: str) -> str:
+    """Return the key for a stat name, built once per name."""
+    return name.replace(" ", "_").lower()
+
+
+@dataclass(frozen=True, slots=True)
 class PelotonStat:
     """Hold stats from latest workout endpoint."""
 
@@ -37,10 +47,69 @@ class PelotonStat:
     icon: Optional[str] = None
     entity_category: Optional[EntityCategory] = None
     entity_registry_enabled_default: Optional[bool] = True
-    
+    # Extra state attributes as (name, value) pairs, so the record stays hashable.
+    attributes: Optional[tuple[tuple[str, Any], ...]] = None
+
+    @property
+    def key(self) -> str:
+        """Return the stable key used for unique ids and stat lookups."""
+        return stat_key(self.name)
+
+
+@callback  # type: ignore
+def async_disabled_stat_keys(
+    hass: core.HomeAssistant, entry: ConfigEntry
+) -> frozenset[str]:
+    """Return the keys of stats whose sensors are disabled in the registry."""
+
+    return frozenset(
+        # Unique ids are "<user id>_<stat key>" and user ids have no underscore.
+        registry_entry.unique_id.partition("_")[2]
+        for registry_entry in er.async_entries_for_config_entry(
+            er.async_get(hass), entry.entry_id
+        )
+        if registry_entry.domain == "sensor" and registry_entry.disabled_by is not None
+    )
 
 
-@dataclass
+class PelotonStatPool:
+    """Deduplicate stat records against the previous poll.
+
+    The stats are still compiled on every poll. Equal ones are swapped for
+    the instance already held, so only one copy is kept alive. When the
+    stats are unchanged and in the same order, the previous list and index
+    are returned as they are.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the pool."""
+        self._quant_data: list[PelotonStat] = []
+        self._quant_index: dict[str, PelotonStat] = {}
+
+    def intern(
+        self, stats: Iterable[PelotonStat]
+    ) -> tuple[list[PelotonStat], dict[str, PelotonStat]]:
+        """Return the stats as a list and as an index by key."""
+
+        quant_data: list[PelotonStat] = []
+        quant_index: dict[str, PelotonStat] = {}
+        for peloton_stat in stats:
+            key = peloton_stat.key
+            if (previous := self._quant_index.get(key)) == peloton_stat:
+                peloton_stat = previous
+            quant_data.append(peloton_stat)
+            quant_index[key] = peloton_stat
+
+        # Reused stats compare by identity, so this is cheap when nothing
+        # changed. Stats that are no longer produced are dropped with the
+        # old index.
+        if quant_data != self._quant_data:
+            self._quant_data = quant_data
+            self._quant_index = quant_index
+        return self._quant_data, self._quant_index
+
+
+@dataclass(frozen=True, slots=True)
 class PelotonMetric:
     """Hold stats from workout metrics endpoint."""
 
@@ -51,7 +120,7 @@ class PelotonMetric:
     device_class: SensorDeviceClass | None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PelotonSummary:
     """Hold summary stats from latest workout endpoint."""
 
@@ -59,7 +128,7 @@ class PelotonSummary:
     unit: str  # Useful for mph vs kmph
     device_class: SensorDeviceClass | None
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PelotonWorkouts:
     """Hold workout count stats from user's profile."""
 
@@ -77,16 +146,17 @@ async def async_setup_entry(
 
     _LOGGER.debug("Creating Peloton binary sensors")
 
-    async_add_entities(
-        (
-            PelotonStatSensor(coordinator=coordinator, peloton_stat=peloton_stat)
-            for peloton_stat in coordinator.data.get("quant_data", [])
-            if isinstance(peloton_stat, PelotonStat)
-        ),
-        True,
+    entities = [
+        PelotonStatSensor(coordinator=coordinator, peloton_stat=peloton_stat)
+        for peloton_stat in coordinator.data.get("quant_data", [])
+        if isinstance(peloton_stat, PelotonStat)
+    ]
+    hass.data[DOMAIN][DATA_INSTRUMENTATION][entry.entry_id].add_state_writers(
+        entities
     )
+    async_add_entities(entities, True)
 
-class PelotonStatSensor(SensorEntity, CoordinatorEntity):  # type: ignore
+class PelotonStatSensor(PelotonStateWriteMixin, SensorEntity, CoordinatorEntity):  # type: ignore
     """Quantative data sensor."""
 
     def __init__(self, coordinator: DataUpdateCoordinator, peloton_stat: PelotonStat) -> None:
@@ -94,13 +164,14 @@ class PelotonStatSensor(SensorEntity, CoordinatorEntity):  # type: ignore
         super().__init__(coordinator)
 
         self.stat_name = peloton_stat.name
+        self.stat_key = peloton_stat.key
         self.coordinator = coordinator
 
         user_id = coordinator.data.get("workout_stats_summary", {}).get("user_id")
 
         self._attr_name = f"{coordinator.data.get('user_profile',{}).get('first_name')} on Peloton: {self.stat_name}"
 
-        self._attr_unique_id = f"{user_id}_{self.stat_name.replace(' ','_').lower()}"
+        self._attr_unique_id = f"{user_id}_{self.stat_key}"
 
         self._attr_device_info: DeviceInfo | None = {"identifiers": {(DOMAIN, user_id)}}
 
@@ -116,17 +187,33 @@ class PelotonStatSensor(SensorEntity, CoordinatorEntity):  # type: ignore
     def _handle_coordinator_update(self) -> None:
         """Update the entity when coordinator is updated."""
 
-        peloton_stat: PelotonStat
-        for peloton_stat in self.coordinator.data.get("quant_data", []):
-            if peloton_stat.name == self.stat_name:
-                self._attr_native_value = peloton_stat.native_value
-                self._attr_native_unit_of_measurement = (
-                    peloton_stat.native_unit_of_measurement
-                )
-                self._attr_device_class = peloton_stat.device_class
-                self._attr_state_class = peloton_stat.state_class
-
-                if peloton_stat.icon:
-                    self._attr_icon = peloton_stat.icon
-
-        self.async_write_ha_state()
+        peloton_stat: PelotonStat | None
+        if (
+            peloton_stat := self.coordinator.data.get("quant_index", {}).get(
+                self.stat_key
+            )
+        ) is not None:
+            self._attr_native_value = peloton_stat.native_value
+            self._attr_native_unit_of_measurement = (
+                peloton_stat.native_unit_of_measurement
+            )
+            self._attr_device_class = peloton_stat.device_class
+            self._attr_state_class = peloton_stat.state_class
+            self._attr_extra_state_attributes = (
+                dict(peloton_stat.attributes) if peloton_stat.attributes else None
+            )
+
+            if peloton_stat.icon:
+                self._attr_icon = peloton_stat.icon
+
+        self.async_write_ha_state_if_changed(
+            (
+                self.available,
+                self.native_value,
+                self.native_unit_of_measurement,
+                self.device_class,
+                self.state_class,
+                self.icon,
+                tuple((self.extra_state_attributes or {}).items()),
+            )
+        )
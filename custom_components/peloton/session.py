@@ -0,0 +1,121 @@
+"""Persist Peloton API sessions across restarts and reloads."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import aiohttp
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.storage import Store
+
+from .api import PelotonApiClient
+from .const import (
+    DATA_CLIENT_SESSION,
+    DATA_SESSION_STORE,
+    DOMAIN,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Delay before writing refreshed tokens to disk.
+SAVE_DELAY = 10
+
+
+class PelotonSessionStore:
+    """Keep each account's OAuth tokens in Home Assistant's storage.
+
+    Reusing a stored access token skips the login round-trip on startup.
+    The API client refreshes or logs in again by itself when a request comes
+    back with an auth error.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the session store."""
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._tokens: dict[str, dict[str, str | None]] | None = None
+
+    async def async_load(self) -> None:
+        """Load stored tokens from disk."""
+        if self._tokens is None:
+            data = await self._store.async_load() or {}
+            self._tokens = data.get("tokens", {})
+
+    def get_tokens(self, username: str) -> dict[str, str | None]:
+        """Return the stored tokens for an account."""
+        return dict((self._tokens or {}).get(username, {}))
+
+    def async_update(self, username: str, api: PelotonApiClient) -> None:
+        """Schedule a save if the account's tokens changed."""
+
+        tokens = api.auth_info
+        if self._tokens is None or self._tokens.get(username) == tokens:
+            return
+
+        _LOGGER.debug("Storing refreshed Peloton session for %s", username)
+        self._tokens[username] = tokens
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_remove(self, username: str) -> None:
+        """Forget an account's tokens."""
+        await self.async_load()
+        if self._tokens is not None and self._tokens.pop(username, None):
+            await self._store.async_save(self._data_to_save())
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to store."""
+        return {"tokens": self._tokens or {}}
+
+
+async def async_get_session_store(hass: HomeAssistant) -> PelotonSessionStore:
+    """Return the integration's session store, loading it on first use."""
+
+    domain_data: dict = hass.data.setdefault(DOMAIN, {})
+    if (session_store := domain_data.get(DATA_SESSION_STORE)) is None:
+        session_store = domain_data[DATA_SESSION_STORE] = PelotonSessionStore(hass)
+    await session_store.async_load()
+    return session_store
+
+
+@callback  # type: ignore
+def async_get_client_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Return the keep-alive aiohttp session shared by all Peloton accounts.
+
+    Accounts only differ by their Authorization header, so they share one
+    connection pool. Cookies are ignored so accounts can never mix sessions.
+    Home Assistant closes the session when it stops.
+    """
+
+    domain_data: dict = hass.data.setdefault(DOMAIN, {})
+    if (session := domain_data.get(DATA_CLIENT_SESSION)) is None:
+        session = domain_data[DATA_CLIENT_SESSION] = async_create_clientsession(
+            hass, cookie_jar=aiohttp.DummyCookieJar()
+        )
+    return session
+
+
+async def async_login(
+    hass: HomeAssistant, username: str, password: str, reuse_session: bool = True
+) -> PelotonApiClient:
+    """Create an API client, reusing stored tokens when there are any.
+
+    The user's profile is fetched to check the session works. Pass
+    reuse_session=False to force a login with the given credentials, e.g.
+    when validating them in the config flow.
+    """
+
+    session_store = await async_get_session_store(hass)
+    tokens = session_store.get_tokens(username) if reuse_session else {}
+
+    api = PelotonApiClient(
+        async_get_client_session(hass),
+        username,
+        password,
+        access_token=tokens.get("access_token"),
+        refresh_token=tokens.get("refresh_token"),
+    )
+    await api.async_get_me()
+    session_store.async_update(username, api)
+    return api